@@ -0,0 +1,49 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+
+
+def as_async_view(view):
+    """Оборачивает представление DRF в корутину для запуска под ASGI.
+
+    Чтения выполняются в общем пуле потоков (thread_sensitive=False), так
+    что медленный запрос к базе не блокирует остальные. Записи остаются
+    в потоке, который Django выделяет синхронному коду.
+    """
+    def run(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    read = sync_to_async(run, thread_sensitive=False)
+    write = sync_to_async(run)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await read(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    return async_view
+
+
+def async_urlpatterns(urlpatterns, viewsets):
+    """Заменяет представления указанных viewset'ов на асинхронные."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            as_async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if getattr(pattern.callback, 'cls', None) in viewsets
+        else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,91 @@
+import time
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.db import use_primary_if_sticky
+from reviews.models import User
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+# user_id -> (token_version или None для неактивных, время истечения)
+_token_versions = {}
+
+
+def get_access_token(user):
+    """Выдаёт токен с данными, нужными для проверки прав без запроса к БД."""
+    token = AccessToken.for_user(user)
+    token['username'] = user.username
+    token['role'] = user.role
+    token['is_staff'] = user.is_staff
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+def get_token_version(user_id):
+    cached = _token_versions.get(user_id)
+    now = time.monotonic()
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    row = User.objects.filter(pk=user_id).values_list(
+        'token_version', 'is_active'
+    ).first()
+    version = row[0] if row and row[1] else None
+    if len(_token_versions) >= settings.TOKEN_VERSION_CACHE_SIZE:
+        _token_versions.clear()
+    _token_versions[user_id] = (
+        version, now + settings.TOKEN_VERSION_CACHE_TTL
+    )
+    return version
+
+
+def forget_token_version(user_id):
+    _token_versions.pop(user_id, None)
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, восстановленный из утверждений токена."""
+
+    def __str__(self):
+        return self.username
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_staff
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @cached_property
+    def instance(self):
+        """Полная запись пользователя из базы, загружается по требованию."""
+        return User.objects.get(pk=self.id)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без загрузки пользователя на каждый запрос.
+
+    Роль и права берутся из токена. Изменение роли, is_staff, username или
+    is_active увеличивает User.token_version, и старые токены перестают
+    приниматься (с задержкой до TOKEN_VERSION_CACHE_TTL в других
+    процессах). Токены без версии проверяются по базе, как раньше.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            use_primary_if_sticky(user_id)
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        if get_token_version(user.id) != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен устарел, получите новый.', code='token_outdated'
+            )
+        return user
@@ -0,0 +1,169 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from reviews.facets import apply_titles_delta, ensure_facets
+from reviews.models import Category, Genre, Title
+from .cache import bump_version
+from .serializers import BulkSlugNameSerializer, BulkTitleSerializer
+
+TitleGenre = Title.genre.through
+
+
+def get_items(data):
+    """Проверяет, что тело запроса — непустой массив допустимого размера."""
+    if not isinstance(data, list) or not data:
+        raise ValidationError(
+            {'non_field_errors': ['Ожидается непустой массив объектов.']}
+        )
+    if len(data) > settings.API_BULK_MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [
+            f'Не больше {settings.API_BULK_MAX_ITEMS} объектов за запрос.'
+        ]})
+    return data
+
+
+def validate_items(serializer_class, items):
+    """Проверяет элементы по отдельности, не обращаясь к базе."""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+    return valid, errors
+
+
+def bulk_upsert_slugged(model, items):
+    """Создаёт или переименовывает категории и жанры по slug."""
+    valid, errors = validate_items(BulkSlugNameSerializer, items)
+    names = {}
+    for index, data in valid:
+        if data['slug'] in names:
+            errors.append({
+                'index': index,
+                'errors': {'slug': ['Повторяется в запросе.']},
+            })
+            continue
+        names[data['slug']] = data['name']
+    with transaction.atomic():
+        existing = list(model.objects.filter(slug__in=names))
+        for obj in existing:
+            obj.name = names[obj.slug]
+        model.objects.bulk_update(existing, ('name',))
+        known = {obj.slug for obj in existing}
+        model.objects.bulk_create(
+            model(slug=slug, name=name)
+            for slug, name in names.items() if slug not in known
+        )
+    bump_version(model)
+    return {
+        'created': sorted(set(names) - known),
+        'updated': sorted(known),
+        'errors': sorted(errors, key=lambda error: error['index']),
+    }
+
+
+def bulk_upsert_titles(items):
+    """Создаёт и обновляет произведения; slug'и разрешаются пачкой.
+
+    Элемент с id обновляет существующее произведение целиком (включая
+    жанры), без id — создаёт новое.
+    """
+    valid, errors = validate_items(BulkTitleSerializer, items)
+    categories = dict(Category.objects.filter(
+        slug__in={data['category'] for _, data in valid}
+    ).values_list('slug', 'pk'))
+    genres = dict(Genre.objects.filter(
+        slug__in={slug for _, data in valid for slug in data.get('genre', ())}
+    ).values_list('slug', 'pk'))
+    existing = set(Title.objects.filter(
+        pk__in={data['id'] for _, data in valid if 'id' in data}
+    ).values_list('pk', flat=True))
+    to_create, to_update = [], []
+    seen_ids = set()
+    for index, data in valid:
+        item_errors = {}
+        if data.get('id') in seen_ids:
+            item_errors['id'] = ['Повторяется в запросе.']
+        if data['category'] not in categories:
+            item_errors['category'] = [
+                f'Категория {data["category"]} не найдена.'
+            ]
+        missing = [
+            slug for slug in data.get('genre', ()) if slug not in genres
+        ]
+        if missing:
+            item_errors['genre'] = [
+                f'Жанр {slug} не найден.' for slug in missing
+            ]
+        if 'id' in data and data['id'] not in existing:
+            item_errors['id'] = [f'Произведение {data["id"]} не найдено.']
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+            continue
+        if 'id' in data:
+            seen_ids.add(data['id'])
+        title = Title(
+            id=data.get('id'),
+            name=data['name'],
+            year=data['year'],
+            description=data.get('description'),
+            category_id=categories[data['category']],
+        )
+        # Множество: повторы slug'а в элементе дали бы дубли в связях.
+        genre_ids = {genres[slug] for slug in data.get('genre', ())}
+        (to_update if 'id' in data else to_create).append((title, genre_ids))
+    with transaction.atomic():
+        # Строки обновляемых произведений блокируются до вычитания их
+        # вклада из фасетов: отзыв не сдвинет прежние фасеты между ними.
+        updated_ids = list(Title.objects.select_for_update().filter(
+            pk__in=[title.pk for title, _ in to_update]
+        ).values_list('pk', flat=True))
+        apply_titles_delta(updated_ids, -1)
+        created = [title for title, _ in to_create]
+        added_ids, saved_ids = list(updated_ids), []
+        if connection.features.can_return_rows_from_bulk_insert:
+            Title.objects.bulk_create(created)
+            added_ids += [title.pk for title in created]
+        else:
+            for title in created:
+                title.save()
+            # Категорию и год таких произведений учли сигналы save().
+            saved_ids = [title.pk for title in created]
+        updated_at = timezone.now()
+        for title, _ in to_update:
+            title.updated_at = updated_at
+        Title.objects.bulk_update(
+            [title for title, _ in to_update],
+            ('name', 'year', 'description', 'category', 'updated_at'),
+        )
+        TitleGenre.objects.filter(
+            title_id__in=[title.pk for title, _ in to_update]
+        ).delete()
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title_id=title.pk, genre_id=genre_id)
+            for title, genre_ids in to_create + to_update
+            for genre_id in genre_ids
+        )
+        genre_ids = {
+            genre_id
+            for _, title_genre_ids in to_create + to_update
+            for genre_id in title_genre_ids
+        }
+        titles = [title for title, _ in to_create + to_update]
+        ensure_facets({
+            'category': {title.category_id for title in titles},
+            'year': {title.year for title in titles},
+            'genre': genre_ids,
+        })
+        apply_titles_delta(added_ids, 1)
+        apply_titles_delta(saved_ids, 1, {'genre': genre_ids})
+    bump_version(Title)
+    return {
+        'created': [title.pk for title, _ in to_create],
+        'updated': [title.pk for title, _ in to_update],
+        'errors': sorted(errors, key=lambda error: error['index']),
+    }
@@ -0,0 +1,93 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHE_HEADER = 'X-Cache'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(model, scope=None):
+    key = f'api:version:{model._meta.label_lower}'
+    return key if scope is None else f'{key}:{scope}'
+
+
+def new_version():
+    return time.time_ns()
+
+
+def bump_version(model, scope=None):
+    """Инвалидирует все закэшированные ответы, зависящие от модели.
+
+    scope сужает версию до записей одного родителя, например отзывов
+    одного произведения.
+    """
+    cache = get_cache()
+    key = version_key(model, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_version(), timeout=None)
+
+
+def get_versions(models, scope=None):
+    cache = get_cache()
+    keys = [version_key(model, scope) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+class CachedResponseMixin:
+    """Кэширует ответы на чтение до изменения моделей из cache_models."""
+    cache_models = ()
+
+    def get_cache_key(self, request):
+        query = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+        versions = '.'.join(map(str, get_versions(self.cache_models)))
+        digest = hashlib.md5(
+            f'{request.path}?{urlencode(query)}'.encode()
+        ).hexdigest()
+        return f'api:response:{versions}:{digest}'
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response[CACHE_HEADER] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response[CACHE_HEADER] = 'MISS'
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,54 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+
+class ConditionalResponseMixin:
+    """Отвечает 304 на условные GET, не сериализуя ответ.
+
+    get_condition() возвращает дешёвое состояние ресурса и время его
+    последнего изменения (или None); из состояния и адреса запроса
+    строится ETag.
+    """
+
+    def get_condition(self):
+        return None
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        condition = self.get_condition()
+        if condition is None:
+            return handler(request, *args, **kwargs)
+        state, last_modified = condition
+        etag = quote_etag(hashlib.md5(
+            repr((request.get_full_path(), state)).encode()
+        ).hexdigest())
+        timestamp = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -1,4 +1,11 @@
 import django_filters as filters
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVectorField,
+                                            TrigramSimilarity)
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
 
 from reviews.models import Title
 
@@ -13,7 +20,42 @@ class TitleFilter(filters.FilterSet):
     genre = filters.CharFilter(
         field_name='genre__slug'
     )
+    search = filters.CharFilter(method='filter_search')
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый и нечёткий поиск с сортировкой по релевантности.
+
+        На PostgreSQL используется сгенерированная колонка search_vector и
+        триграммный индекс по названию (миграция 0006), на остальных СУБД —
+        поиск подстроки в названии и описании (на SQLite регистр не
+        учитывается только для латиницы).
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        query = SearchQuery(
+            value,
+            config=settings.TITLE_SEARCH_CONFIG,
+            search_type='websearch'
+        )
+        search_vector = RawSQL(
+            '{}.search_vector'.format(
+                connection.ops.quote_name(Title._meta.db_table)
+            ),
+            [],
+            output_field=SearchVectorField()
+        )
+        return queryset.alias(
+            search_vector=search_vector,
+        ).alias(
+            search_rank=SearchRank(F('search_vector'), query),
+            name_similarity=TrigramSimilarity('name', value),
+        ).filter(
+            Q(search_vector=query) | Q(name__trigram_similar=value)
+        ).order_by('-search_rank', '-name_similarity', 'name')
 
     class Meta:
         model = Title
-        fields = ['name', 'category', 'genre', 'year']
+        fields = ['name', 'category', 'genre', 'year', 'search']
@@ -0,0 +1,124 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """Очередь исходящих писем с пулом фоновых отправителей.
+
+    Каждый поток забирает из очереди пачку до MAIL_QUEUE_BATCH_SIZE писем
+    и отправляет их через одно открытое соединение, которое
+    переиспользуется, пока в очереди есть письма. Неотправленные письма
+    повторяются до MAIL_QUEUE_MAX_RETRIES раз с экспоненциальной паузой.
+    При MAIL_QUEUE_WORKERS = 0 письма отправляются сразу в вызывающем
+    потоке одной попыткой, без пауз и повторов: запрос не ждёт.
+
+    Очередь хранится в памяти процесса и доставку не гарантирует: письма,
+    не отправленные к перезапуску или аварийному завершению воркера,
+    теряются (при обычном выходе их ждёт atexit до
+    MAIL_QUEUE_EXIT_TIMEOUT секунд).
+    """
+    idle_timeout = 5
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def enqueue(self, message):
+        if not settings.MAIL_QUEUE_WORKERS:
+            self._close(self._deliver([message], None, retries=0))
+            return
+        self._start()
+        self._queue.put(message)
+
+    def flush(self, timeout=None):
+        """Ждёт, пока все письма из очереди будут обработаны."""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def _start(self):
+        with self._lock:
+            if self._workers:
+                return
+            for number in range(settings.MAIL_QUEUE_WORKERS):
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f'mail-queue-{number}',
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            atexit.register(self.flush, settings.MAIL_QUEUE_EXIT_TIMEOUT)
+
+    def _work(self):
+        connection = None
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                connection = self._close(connection)
+                continue
+            while len(batch) < settings.MAIL_QUEUE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                connection = self._deliver(batch, connection)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, messages, connection, retries=None):
+        if retries is None:
+            retries = settings.MAIL_QUEUE_MAX_RETRIES
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(
+                    settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempt - 1)
+                )
+            failed = []
+            for message in messages:
+                try:
+                    if connection is None:
+                        connection = get_connection(fail_silently=False)
+                        connection.open()
+                    connection.send_messages([message])
+                except Exception:
+                    logger.warning(
+                        'Ошибка отправки письма на %s (попытка %d)',
+                        ', '.join(message.to), attempt + 1,
+                        exc_info=True
+                    )
+                    connection = self._close(connection)
+                    failed.append(message)
+            messages = failed
+            if not messages:
+                return connection
+        for message in messages:
+            logger.error(
+                'Письмо на %s не отправлено', ', '.join(message.to)
+            )
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning('Ошибка закрытия соединения', exc_info=True)
+        return None
+
+
+mail_queue = MailQueue()
@@ -0,0 +1,116 @@
+import hashlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+
+from .cache import get_cache, get_versions
+
+
+def estimate_count(queryset):
+    """Оценка числа строк таблицы по статистике PostgreSQL или None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class '
+            'WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+class CachedCountPaginator(Paginator):
+    """Кэширует COUNT(*) по SQL запроса, большие таблицы оценивает."""
+    count_estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_count(queryset)
+            if (
+                estimate is not None
+                and estimate >= settings.API_COUNT_ESTIMATE_THRESHOLD
+            ):
+                self.count_estimated = True
+                return estimate
+        sql = repr(queryset.query.sql_with_params())
+        versions = '.'.join(map(str, get_versions((queryset.model,))))
+        key = 'api:count:{}:{}'.format(
+            versions, hashlib.md5(sql.encode()).hexdigest()
+        )
+        return get_cache().get_or_set(
+            key, queryset.count, settings.API_COUNT_CACHE_TIMEOUT
+        )
+
+
+class PubDateCursorPagination(CursorPagination):
+    ordering = ('-pub_date', '-id')
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """Постраничная пагинация либо курсор по (-pub_date, -id).
+
+    Курсорный режим включается параметром ?pagination=cursor или наличием
+    ?cursor=; для всего эндпоинта его можно сделать режимом по умолчанию
+    через default_mode. Курсор не требует COUNT(*) и OFFSET.
+    """
+    mode_query_param = 'pagination'
+    default_mode = 'page'
+    paginators = {
+        'page': PageNumberPagination,
+        'cursor': PubDateCursorPagination,
+    }
+
+    def get_mode(self, request):
+        if PubDateCursorPagination.cursor_query_param in request.query_params:
+            return 'cursor'
+        mode = request.query_params.get(self.mode_query_param)
+        return mode if mode in self.paginators else self.default_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.paginators[self.get_mode(request)]()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return data['results']
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            PageNumberPagination().get_schema_operation_parameters(view)
+            + PubDateCursorPagination().get_schema_operation_parameters(view)
+        )
+
+
+class CachedCountPagination(PageNumberPagination):
+    django_paginator_class = CachedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_estimated', self.page.paginator.count_estimated),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_estimated'] = {
+            'type': 'boolean',
+        }
+        return response_schema
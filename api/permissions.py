@@ -1,23 +1,33 @@
+from collections import namedtuple
+
 from rest_framework import permissions
 
+UserRoles = namedtuple('UserRoles', 'is_authenticated is_admin is_moderator')
+
+
+def get_user_roles(request):
+    """Роли пользователя, вычисленные один раз за запрос."""
+    roles = getattr(request, '_user_roles', None)
+    if roles is None:
+        user = request.user
+        if user.is_authenticated:
+            roles = UserRoles(True, user.is_admin, user.is_moderator)
+        else:
+            roles = UserRoles(False, False, False)
+        request._user_roles = roles
+    return roles
+
 
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        if (request.user.is_authenticated):
-            return (
-                request.user.is_admin
-            )
-        return False
+        return get_user_roles(request).is_admin
 
 
 class IsAdminOrReadOnlyMy(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.method in permissions.SAFE_METHODS
-            or (
-                request.user.is_authenticated
-                and request.user.is_admin
-            )
+            or get_user_roles(request).is_admin
         )
 
 
@@ -25,17 +35,15 @@ class AdminOrModeratorOrAuthorOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_authenticated
+            or get_user_roles(request).is_authenticated
         )
 
     def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        roles = get_user_roles(request)
         return (
-            request.method in permissions.SAFE_METHODS
-            or (
-                (
-                    obj.author == request.user
-                    or request.user.is_moderator
-                    or request.user.is_admin
-                )
-            )
+            obj.author_id == request.user.pk
+            or roles.is_moderator
+            or roles.is_admin
         )
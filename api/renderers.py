@@ -0,0 +1,49 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson.
+
+    Используется только для компактного вывода без экранирования
+    не-ASCII (настройки DRF по умолчанию). С отступами, без orjson или
+    для данных, которые orjson не сериализует, работает JSONRenderer.
+    Даты и прочие нестандартные типы сериализует кодировщик DRF.
+
+    Строки, целые числа и даты выводятся побайтно как у JSONRenderer,
+    но вывод совпадает не всегда:
+
+    * экспонента float пишется без знака плюс (1e16 вместо 1e+16), JSON
+      при этом тот же;
+    * NaN и Infinity становятся null, тогда как JSONRenderer в строгом
+      режиме на них падает с ValueError.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                ),
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и JSONRenderer, экранируем разделители строк для JavaScript.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
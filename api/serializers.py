@@ -1,6 +1,6 @@
 from django.conf import settings
-from django.core.exceptions import ValidationError
-from django.shortcuts import get_object_or_404
+from django.db.models import Value
+from django.db.models.functions import Lower
 from rest_framework import serializers
 
 from reviews.models import User, Category, Genre, Title, Comment, Review
@@ -43,6 +43,25 @@ class UserSerializer(serializers.ModelSerializer):
             'role'
         )
 
+    def validate_unique_lower(self, field, value):
+        """Уникальность без учёта регистра, как у индексов по lower()."""
+        users = User.objects.alias(
+            value_lower=Lower(field)
+        ).filter(value_lower=Lower(Value(value)))
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        if users.exists():
+            raise serializers.ValidationError(
+                'Пользователь с таким значением уже существует.'
+            )
+        return value
+
+    def validate_username(self, value):
+        return self.validate_unique_lower('username', value)
+
+    def validate_email(self, value):
+        return self.validate_unique_lower('email', value)
+
 
 class UserMeSerializer(UserSerializer):
     class Meta(UserSerializer.Meta):
@@ -66,13 +85,40 @@ class GenreSerializer(serializers.ModelSerializer):
         }
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Урезает представление до полей fields.
+
+    Связи из expandable_fields, не перечисленные в expand, отдаются
+    списком slug'ов вместо вложенных объектов. Без fields и expand
+    представление не меняется.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if expand is not None:
+            for name in self.expandable_fields:
+                if name in self.fields and name not in expand:
+                    self.fields[name] = serializers.SlugRelatedField(
+                        slug_field='slug',
+                        many=isinstance(
+                            self.fields[name], serializers.ListSerializer
+                        ),
+                        read_only=True
+                    )
+
+
+class TitleReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(many=False, required=True)
     genre = GenreSerializer(many=True, required=False)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
     year = serializers.IntegerField(
         validators=[validate_year],
     )
+    expandable_fields = ('category', 'genre')
 
     class Meta:
         fields = (
@@ -88,6 +134,22 @@ class TitleReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class TitleTopSerializer(TitleReadSerializer):
+    weighted_rating = serializers.FloatField(
+        source='leaderboard.weighted_rating', read_only=True
+    )
+    trending_score = serializers.FloatField(
+        source='leaderboard.trending_score', read_only=True
+    )
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + (
+            'weighted_rating',
+            'trending_score',
+        )
+        read_only_fields = fields
+
+
 class TitleReWriteSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug', many=False, queryset=Category.objects.all()
@@ -111,6 +173,25 @@ class TitleReWriteSerializer(serializers.ModelSerializer):
         model = Title
 
 
+class BulkSlugNameSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=settings.GROUP_MAX_LENGTH)
+    slug = serializers.SlugField(max_length=settings.SLUG_MAX_LENGTH)
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False, min_value=1)
+    name = serializers.CharField(max_length=settings.TITLE_MAX_LENGTH)
+    year = serializers.IntegerField(validators=[validate_year])
+    description = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True
+    )
+    category = serializers.SlugField(max_length=settings.SLUG_MAX_LENGTH)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=settings.SLUG_MAX_LENGTH),
+        required=False
+    )
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
@@ -129,19 +210,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method != 'POST':
-            return data
-        title_id = self.context['view'].kwargs.get('title_id')
-        if Review.objects.filter(
-                title=get_object_or_404(Title, pk=title_id),
-                author=request.user).exists():
-            raise ValidationError(
-                'Не найдено произведение или отзыв'
-            )
-        return data
-
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
@@ -0,0 +1,48 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, Review, Title, User,
+                            is_title_deleting)
+from .authentication import forget_token_version
+from .cache import bump_version
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    if sender is Review and is_title_deleting(instance.title_id):
+        # Версия отзывов сдвигается один раз при удалении произведения.
+        return
+    bump_version(sender)
+    if sender is Title and kwargs.get('signal') is post_delete:
+        bump_version(Review)
+    if sender is Review:
+        bump_version(Review, instance.title_id)
+        # Отзыв, перенесённый в админке, пропадает из прежней ленты.
+        old_title_id = getattr(instance, '_loaded_rating_state', (None,))[0]
+        if old_title_id not in (None, instance.title_id):
+            bump_version(Review, old_title_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feed(sender, instance, **kwargs):
+    bump_version(Comment, instance.review_id)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version(Title)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_token_version(sender, instance, **kwargs):
+    forget_token_version(instance.pk)
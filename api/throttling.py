@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'20/hour' -> (ёмкость корзины, период в секундах)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+class LocMemBucketStore:
+    """Корзины в памяти процесса: у каждого воркера свои счётчики."""
+    max_keys = 100000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def take(self, buckets):
+        """Берёт по токену из каждой корзины [(ключ, ёмкость, период)].
+
+        Токены списываются, только если их хватает во всех корзинах;
+        иначе возвращается, сколько секунд ждать (0 — запрос разрешён).
+        """
+        now = time.monotonic()
+        with self.lock:
+            states, wait = [], 0
+            for key, capacity, period in buckets:
+                rate = capacity / period
+                tokens, updated, _ = self.buckets.get(
+                    key, (capacity, now, now)
+                )
+                tokens = min(capacity, tokens + (now - updated) * rate)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                states.append((key, tokens - 1, capacity, rate))
+            if wait:
+                return wait
+            for key, tokens, capacity, rate in states:
+                self.buckets[key] = (
+                    tokens, now, now + (capacity - tokens) / rate
+                )
+            if len(self.buckets) > self.max_keys:
+                self.evict(now)
+        return 0
+
+    def evict(self, now):
+        """Удаляет полные корзины, а при нехватке — ближайшие к полным."""
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items()
+            if bucket[2] > now
+        }
+        if len(self.buckets) > self.max_keys:
+            keep = sorted(
+                self.buckets.items(), key=lambda item: item[1][2]
+            )[-self.max_keys // 2:]
+            self.buckets = dict(keep)
+
+
+# Атомарно пополняет корзины KEYS по времени сервера Redis (ARGV — пары
+# ёмкость, скорость) и берёт по токену, только если хватает во всех.
+TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local states = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+    states[i] = tokens - 1
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    redis.call('HSET', key, 'tokens', tostring(states[i]),
+               'updated', tostring(now))
+    redis.call('PEXPIRE', key,
+               math.ceil((capacity - states[i]) / rate * 1000) + 1000)
+end
+return '0'
+"""
+
+
+class RedisBucketStore:
+    """Общие для всех воркеров корзины в Redis (THROTTLE_REDIS_URL)."""
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured(
+                'Для RedisBucketStore нужен пакет redis.'
+            )
+        if not settings.THROTTLE_REDIS_URL:
+            raise ImproperlyConfigured('Не задан THROTTLE_REDIS_URL.')
+        self.error = redis.RedisError
+        self.client = redis.Redis.from_url(settings.THROTTLE_REDIS_URL)
+        self.script = self.client.register_script(TAKE_SCRIPT)
+
+    def take(self, buckets):
+        args = []
+        for _, capacity, period in buckets:
+            args += [capacity, capacity / period]
+        try:
+            return float(self.script(
+                keys=[key for key, _, _ in buckets], args=args
+            ))
+        except self.error:
+            # Недоступный Redis не должен блокировать вход.
+            logger.exception('Ограничение частоты пропущено')
+            return 0
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.THROTTLE_STORE)()
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Корзины токенов по IP и полям запроса до обращения к базе.
+
+    Лимиты берутся из AUTH_THROTTLE_RATES[scope]: {ключ: 'N/период'},
+    где ключ — 'ip' или поле тела запроса (username, email).
+    """
+    scope = None
+
+    def get_ident(self, request):
+        """IP клиента: X-Forwarded-For учитывается только при NUM_PROXIES.
+
+        Без NUM_PROXIES заголовок задаёт сам клиент, и подмена давала бы
+        новую корзину на каждый запрос.
+        """
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return super().get_ident(request)
+
+    def allow_request(self, request, view):
+        rates = settings.AUTH_THROTTLE_RATES.get(self.scope) or {}
+        data = request.data if hasattr(request.data, 'get') else {}
+        buckets = []
+        for field, rate in rates.items():
+            if not rate:
+                continue
+            if field == 'ip':
+                value = str(self.get_ident(request))
+            else:
+                value = data.get(field)
+                if not isinstance(value, str) or not value:
+                    continue
+                value = value.strip().lower()
+            key = 'throttle:{}:{}:{}'.format(
+                self.scope, field, hashlib.md5(value.encode()).hexdigest()
+            )
+            buckets.append((key, *parse_rate(rate)))
+        self.wait_seconds = get_store().take(buckets) if buckets else 0
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(TokenBucketThrottle):
+    scope = 'token'
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .async_views import async_urlpatterns
 from .views import (UserViewSet, TitleViewSet, CategoryViewSet, GenreViewSet,
                     ReviewViewSet, CommentViewSet, send_code, get_jwt)
 
@@ -19,12 +21,18 @@ router_v1.register(
     r'/comments', CommentViewSet, basename='comments'
 )
 
+urlpatterns_v1 = router_v1.urls
+if settings.ASYNC_VIEWS:
+    urlpatterns_v1 = async_urlpatterns(
+        urlpatterns_v1, (TitleViewSet, ReviewViewSet, CommentViewSet)
+    )
+
 urlpatterns_auth = [
     path('signup/', send_code, name='send_code'),
     path('token/', get_jwt, name='get_token'),
 ]
 
 urlpatterns = [
-    path('v1/', include(router_v1.urls)),
+    path('v1/', include(urlpatterns_v1)),
     path('v1/auth/', include(urlpatterns_auth)),
 ]
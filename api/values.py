@@ -0,0 +1,73 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from api_yamdb.metrics import serializer_timer
+
+UNSUPPORTED_FIELDS = (
+    serializers.BaseSerializer,
+    serializers.ManyRelatedField,
+    serializers.RelatedField,
+    serializers.SerializerMethodField,
+)
+
+
+def get_values_fields(serializer):
+    """Список (поле, lookup для values(), преобразование) или None.
+
+    None означает, что сериализатор нельзя заменить строками .values():
+    в нём есть вложенные, вычисляемые или многие-ко-многим поля.
+    """
+    values_fields = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SlugRelatedField):
+            lookup = f'{field.source}__{field.slug_field}'
+            convert = None
+        elif isinstance(field, UNSUPPORTED_FIELDS) or field.source == '*':
+            return None
+        else:
+            lookup = field.source.replace('.', '__')
+            convert = field.to_representation
+        values_fields.append((name, lookup, convert))
+    return values_fields
+
+
+def values_to_representation(rows, values_fields):
+    return [
+        {
+            name: (
+                row[lookup] if convert is None or row[lookup] is None
+                else convert(row[lookup])
+            )
+            for name, lookup, convert in values_fields
+        }
+        for row in rows
+    ]
+
+
+class ValuesListMixin:
+    """Список только для чтения из строк .values() вместо моделей.
+
+    Поля и источники берутся из сериализатора, поэтому ответ совпадает с
+    обычным; SlugRelatedField разрешается JOIN'ом в том же запросе, а
+    COUNT для страниц считается без него.
+    """
+
+    def list(self, request, *args, **kwargs):
+        values_fields = get_values_fields(self.get_serializer())
+        if values_fields is None:
+            return super().list(request, *args, **kwargs)
+        base = self.filter_queryset(self.get_queryset())
+        queryset = base.values(*{lookup for _, lookup, _ in values_fields})
+        # Paginator считает строки через count(): JOIN'ы, добавленные
+        # values() ради SlugRelatedField, для подсчёта не нужны.
+        queryset.count = base.count
+        page = self.paginate_queryset(queryset)
+        with serializer_timer():
+            data = values_to_representation(
+                queryset if page is None else page, values_fields
+            )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
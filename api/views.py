@@ -1,12 +1,19 @@
+import operator
+from functools import reduce
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.core.mail import EmailMessage
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Q, Value
+from django.db.models.functions import Lower
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets, mixins
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import (
     AllowAny,
@@ -14,9 +21,14 @@ from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
+from .authentication import get_access_token
+from .bulk import bulk_upsert_slugged, bulk_upsert_titles, get_items
+from .cache import CachedListMixin, CachedRetrieveMixin, get_versions
+from .conditional import ConditionalListMixin, ConditionalRetrieveMixin
 from .filters import TitleFilter
+from .mail_queue import mail_queue
+from .pagination import CachedCountPagination, PageNumberOrCursorPagination
 from .permissions import (
     IsAdmin,
     IsAdminOrReadOnlyMy,
@@ -31,57 +43,65 @@ from .serializers import (
     SendCodeSerializer,
     TitleReWriteSerializer,
     TitleReadSerializer,
+    TitleTopSerializer,
     UserSerializer,
     ReviewSerializer
 )
+from .throttling import SignupThrottle, TokenThrottle
+from .values import ValuesListMixin
 
-from reviews.models import User, Title, Category, Genre, Review
+from api_yamdb.metrics import SerializerMetricsMixin
+from reviews.models import (User, Title, TitleFacet, Category, Genre, Review,
+                            Comment)
+from reviews.signup import EMAIL_TAKEN, USERNAME_TAKEN, signup_user
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([TokenThrottle])
 def get_jwt(request):
     serializer = CheckConfirmationCodeSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data['username']
     confirmation_code = serializer.validated_data['confirmation_code']
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.alias(username_lower=Lower('username')),
+        username_lower=Lower(Value(username))
+    )
     if default_token_generator.check_token(user, confirmation_code):
-        token = str(AccessToken.for_user(user))
+        token = str(get_access_token(user))
         return Response({'access': token}, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([SignupThrottle])
 def send_code(request):
     serializer = SendCodeSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    email = request.data.get("email", False)
-    username = request.data.get("username", False)
-
-    try:
-        user, created = User.objects.get_or_create(email=email,
-                                                   username=username)
-    except IntegrityError:
-        return Response(
-            'Такой логин или email уже существуют',
-            status=status.HTTP_400_BAD_REQUEST
+    status_, user = signup_user(**serializer.validated_data)
+    if status_ == USERNAME_TAKEN:
+        raise ValidationError(
+            {'username': ['Пользователь с таким именем уже существует.']}
+        )
+    if status_ == EMAIL_TAKEN:
+        raise ValidationError(
+            {'email': ['Пользователь с такой почтой уже существует.']}
         )
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    mail_queue.enqueue(EmailMessage(
         "Code",
         confirmation_code,
         settings.EMAIL_HOST_USER,
-        [email],
-        fail_silently=False,
-    )
+        [user.email],
+    ))
     return Response(
         serializer.initial_data, status=status.HTTP_200_OK
     )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SerializerMetricsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
@@ -97,7 +117,7 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def get_patch_me(self, request):
-        user = get_object_or_404(User, username=self.request.user)
+        user = get_object_or_404(User, pk=self.request.user.pk)
         if request.method == 'GET':
             serializer = UserMeSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -109,25 +129,214 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score'))
+class TitleViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    SerializerMetricsMixin,
+    viewsets.ModelViewSet
+):
+    cache_models = (Title, Category, Genre, Review)
+    queryset = Title.objects.all()
     serializer_class = TitleReWriteSerializer
     permission_classes = (IsAdminOrReadOnlyMy,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = CachedCountPagination
     ordering = ('name',)
 
+    top_orderings = {
+        'rating': '-leaderboard__weighted_rating',
+        'trending': '-leaderboard__trending_score',
+    }
+    top_limit = 10
+    top_max_limit = 100
+    facet_names = ('category', 'genre', 'year')
+
+    # Колонки, которые нужны для поля ответа при ?fields=.
+    sparse_columns = {
+        'id': (),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'description': ('description',),
+        'category': ('category', 'category__slug'),
+        'weighted_rating': ('leaderboard__weighted_rating',),
+        'trending_score': ('leaderboard__trending_score',),
+    }
+
+    def get_queryset(self):
+        queryset = self.queryset
+        if self.action == 'top':
+            queryset = queryset.filter(
+                leaderboard__isnull=False
+            ).select_related('leaderboard')
+        if self.action not in ('retrieve', 'list', 'top'):
+            return queryset
+        fields, expand = self.get_sparse_fields()
+        if fields is None and expand is None:
+            return queryset.select_related('category').prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.only('slug', 'name'))
+            )
+        if fields is None:
+            fields = self.get_serializer_class().Meta.fields
+        expand = expand or ()
+        columns = [
+            column for name in fields
+            for column in self.sparse_columns.get(name, ())
+        ]
+        if 'category' in fields:
+            queryset = queryset.select_related('category')
+            if 'category' in expand:
+                columns.append('category__name')
+        if 'genre' in fields:
+            genre_columns = ['slug']
+            if 'genre' in expand:
+                genre_columns.append('name')
+            queryset = queryset.prefetch_related(Prefetch(
+                'genre', queryset=Genre.objects.only(*genre_columns)
+            ))
+        return queryset.only(*columns) if columns else queryset.only('id')
+
+    def get_condition(self):
+        if self.action == 'list':
+            return get_versions(self.cache_models), None
+        if self.action == 'retrieve':
+            updated_at = Title.objects.filter(
+                pk=self.kwargs.get('pk')
+            ).values_list('updated_at', flat=True).first()
+            if updated_at is None:
+                return None
+            return (updated_at, get_versions((Category, Genre))), updated_at
+        return None
+
+    def perform_create(self, serializer):
+        # Произведение, его жанры и фасеты сохраняются вместе.
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        names = self.parse_field_list('facets')
+        if names:
+            response.data['facets'] = self.get_facets(names)
+        return response
+
+    def get_facets(self, names):
+        """Статистика из TitleFacet по всем произведениям, без фильтров."""
+        facets = {name: [] for name in names}
+        rows = TitleFacet.objects.filter(reduce(operator.or_, (
+            Q(**{f'{name}__isnull': False}) for name in names
+        )), titles_count__gt=0).values(
+            'category__slug', 'category__name', 'genre__slug', 'genre__name',
+            'year', 'titles_count', 'reviews_count', 'rating'
+        )
+        for row in rows:
+            stats = {
+                'titles_count': row['titles_count'],
+                'reviews_count': row['reviews_count'],
+                'rating': row['rating'],
+            }
+            if row['year'] is not None:
+                facets['year'].append({'year': row['year'], **stats})
+                continue
+            name = 'category' if row['category__slug'] else 'genre'
+            facets[name].append({
+                'name': row[f'{name}__name'],
+                'slug': row[f'{name}__slug'],
+                **stats,
+            })
+        for name, items in facets.items():
+            if name == 'year':
+                items.sort(key=lambda item: item['year'], reverse=True)
+            else:
+                items.sort(key=lambda item: (item['name'], item['slug']))
+        return facets
+
+    def get_sparse_fields(self):
+        """Разбирает ?fields= и ?expand= (списки через запятую)."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = tuple(
+                self.parse_field_list(param)
+                for param in ('fields', 'expand')
+            )
+        return self._sparse_fields
+
+    def parse_field_list(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = [name for name in value.split(',') if name]
+        serializer_class = self.get_serializer_class()
+        allowed = {
+            'expand': serializer_class.expandable_fields,
+            'facets': self.facet_names,
+        }.get(param, serializer_class.Meta.fields)
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise ValidationError({param: 'Неизвестные поля: {}.'.format(
+                ', '.join(unknown)
+            )})
+        return names
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('retrieve', 'list', 'top'):
+            fields, expand = self.get_sparse_fields()
+            if fields is not None or expand is not None:
+                kwargs['fields'], kwargs['expand'] = fields, expand or ()
+        return super().get_serializer(*args, **kwargs)
+
     def get_serializer_class(self):
+        if self.action == 'top':
+            return TitleTopSerializer
         if self.action in ('retrieve', 'list'):
             return TitleReadSerializer
         return TitleReWriteSerializer
 
+    @action(methods=['get'], detail=False, url_path='top')
+    def top(self, request):
+        """Топ по взвешенному рейтингу или трендам (?order=trending)."""
+        order = request.query_params.get('order', 'rating')
+        if order not in self.top_orderings:
+            raise ValidationError({'order': 'Допустимые значения: {}.'.format(
+                ', '.join(self.top_orderings)
+            )})
+        try:
+            limit = min(
+                int(request.query_params.get('limit', self.top_limit)),
+                self.top_max_limit
+            )
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        queryset = self.filter_queryset(self.get_queryset())
+        if order == 'trending':
+            queryset = queryset.filter(leaderboard__trending_score__gt=0)
+        queryset = queryset.order_by(self.top_orderings[order], 'name')
+        serializer = self.get_serializer(queryset[:max(limit, 0)], many=True)
+        return Response(serializer.data)
+
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='bulk',
+        permission_classes=(IsAdmin,)
+    )
+    def bulk(self, request):
+        """Создаёт (без id) и обновляет (с id) произведения массивом."""
+        return Response(bulk_upsert_titles(get_items(request.data)))
+
 
 class CategoryGenreViewSet(
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
+    SerializerMetricsMixin,
     viewsets.GenericViewSet,
 ):
     permission_classes = [
@@ -138,44 +347,136 @@ class CategoryGenreViewSet(
     search_fields = ('name', 'slug')
     lookup_field = 'slug'
 
+    @action(
+        methods=['post'],
+        detail=False,
+        url_path='bulk',
+        permission_classes=(IsAdmin,)
+    )
+    def bulk(self, request):
+        """Создаёт или переименовывает объекты по slug массивом."""
+        return Response(bulk_upsert_slugged(
+            self.queryset.model, get_items(request.data)
+        ))
+
 
 class CategoryViewSet(CategoryGenreViewSet):
+    cache_models = (Category,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
 class GenreViewSet(CategoryGenreViewSet):
+    cache_models = (Genre,)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+def get_feed_condition(queryset, action, kwargs, get_parent):
+    """Состояние ленты отзывов или комментариев.
+
+    Список отдаёт только ETag из версии ленты родителя: Last-Modified по
+    записям не заметил бы удаления, а подсчёт записей на каждый запрос
+    вернул бы COUNT в курсорную пагинацию.
+    """
+    if action == 'retrieve':
+        updated_at = queryset.filter(
+            pk=kwargs.get('pk')
+        ).values_list('updated_at', flat=True).first()
+        return None if updated_at is None else (updated_at, updated_at)
+    if action == 'list':
+        try:
+            parent = get_parent()
+        except Http404:
+            return None
+        return get_versions((queryset.model,), scope=parent.pk), None
+    return None
+
+
+class ReviewViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ValuesListMixin,
+    SerializerMetricsMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = ReviewSerializer
     permission_classes = (AdminOrModeratorOrAuthorOrReadOnly,)
+    pagination_class = PageNumberOrCursorPagination
+
+    def get_condition(self):
+        reviews = Review.objects.filter(title_id=self.kwargs.get('title_id'))
+        return get_feed_condition(
+            reviews, self.action, self.kwargs, self.get_title
+        )
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            # Нужен только ключ: проверка существования и связь отзыва.
+            self._title = get_object_or_404(
+                Title.objects.only('pk'), pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
+        if self.detail:
+            return Review.objects.filter(
+                title_id=self.kwargs.get('title_id')
+            ).select_related('author')
         return self.get_title().reviews.all()
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author_id=self.request.user.pk, title=title)
+        except IntegrityError:
+            raise ValidationError('Вы уже оставили отзыв на это произведение.')
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    ValuesListMixin,
+    SerializerMetricsMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
     permission_classes = (AdminOrModeratorOrAuthorOrReadOnly,)
+    pagination_class = PageNumberOrCursorPagination
 
-    def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id')
+    def get_condition(self):
+        comments = Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
         )
+        return get_feed_condition(
+            comments, self.action, self.kwargs, self.get_review
+        )
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('pk'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all()
+        if self.detail:
+            return Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id')
+            ).select_related('author')
+        return self.get_review().comments.all()
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        review = self.get_review()
+        try:
+            with transaction.atomic():
+                serializer.save(author_id=self.request.user.pk, review=review)
+        except IntegrityError:
+            raise ValidationError(
+                'Вы уже оставили комментарий к этому отзыву.'
+            )
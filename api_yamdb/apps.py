@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.core import checks
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+
+
+class ApiYamdbConfig(AppConfig):
+    name = 'api_yamdb'
+
+    def ready(self):
+        from .db import check_persistent_connections, check_sticky_cache
+        from .metrics import install_query_recorder
+        request_started.connect(check_persistent_connections)
+        checks.register(check_sticky_cache, checks.Tags.caches)
+        connection_created.connect(install_query_recorder)
@@ -0,0 +1,162 @@
+import asyncio
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+def check_persistent_connections(**kwargs):
+    """Закрывает сохранённые соединения, которые перестали отвечать.
+
+    Django 3.2 проверяет соединение только после ошибки, поэтому разрыв
+    со стороны сервера или пулера иначе приводит к ошибке первого запроса.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+class RoutingState:
+    def __init__(self, use_primary):
+        self.use_primary = use_primary
+        self.wrote = False
+        self.replica = None
+
+
+# Состояние маршрутизации текущего запроса; вне HTTP-запросов (команды,
+# миграции, фоновые потоки) чтение всегда идёт в основную базу.
+_routing_state = ContextVar('routing_state', default=None)
+
+
+# Cookie клиента, который недавно что-то записал.
+STICKY_COOKIE = 'yamdb_primary'
+
+
+def sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+
+def use_primary():
+    state = _routing_state.get()
+    if state is not None:
+        state.use_primary = True
+
+
+def use_primary_if_sticky(user_id):
+    """Отправляет чтения в основную базу сразу после записей пользователя."""
+    if settings.DATABASE_REPLICAS and cache.get(sticky_key(user_id)):
+        use_primary()
+
+
+class PrimaryReplicaRouter:
+    """Чтения безопасных запросов идут в реплики, остальное — в default.
+
+    Запрос переключается на основную базу после первой записи, а также
+    если пользователь что-то записал за последние REPLICA_STICKY_SECONDS.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state.use_primary:
+            return 'default'
+        if state.replica is None:
+            state.replica = random.choice(settings.DATABASE_REPLICAS)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.use_primary = state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def check_sticky_cache(app_configs, **kwargs):
+    """Метки «чтения из основной базы» должны быть видны всем воркерам."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DATABASE_REPLICAS and backend.endswith('LocMemCache'):
+        return [checks.Warning(
+            'DB_REPLICA_HOSTS задан, а кэш по умолчанию локален для '
+            'процесса: после записи другой воркер может прочитать реплику.',
+            hint='Задайте CACHE_REDIS_URL.',
+            id='api_yamdb.W001',
+        )]
+    return []
+
+
+class PrimaryReplicaMiddleware:
+    """Задаёт маршрутизацию чтений на время запроса (WSGI и ASGI).
+
+    После записи метка «читать из основной базы» ставится и в общий кэш
+    (для токенов), и в cookie: она работает без общего кэша, если клиент
+    хранит cookie.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: Django вызовет экземпляр через await.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = self.get_state(request)
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.mark_sticky(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.get_state(request)
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.mark_sticky(request, response, state)
+
+    def get_state(self, request):
+        return RoutingState(
+            use_primary=(
+                not settings.DATABASE_REPLICAS
+                or request.method not in SAFE_METHODS
+                or STICKY_COOKIE in request.COOKIES
+            )
+        )
+
+    def mark_sticky(self, request, response, state):
+        if not (state.wrote and settings.DATABASE_REPLICAS):
+            return response
+        response.set_cookie(
+            STICKY_COOKIE,
+            '1',
+            max_age=settings.REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite='Lax'
+        )
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            cache.set(
+                sticky_key(user.pk), True, settings.REPLICA_STICKY_SECONDS
+            )
+        return response
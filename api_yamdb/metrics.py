@@ -0,0 +1,268 @@
+import asyncio
+import bisect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Гистограммы: (имя, описание, корзины, атрибут RequestMetrics).
+METRICS = (
+    ('yamdb_request_duration_seconds', 'Время обработки запроса.',
+     TIME_BUCKETS, 'wall_time'),
+    ('yamdb_request_db_seconds', 'Время SQL-запросов.',
+     TIME_BUCKETS, 'db_time'),
+    ('yamdb_request_queries', 'Количество SQL-запросов.',
+     QUERY_BUCKETS, 'queries'),
+    ('yamdb_request_serializer_seconds', 'Время сериализации ответа.',
+     TIME_BUCKETS, 'serializer_time'),
+    ('yamdb_response_size_bytes', 'Размер тела ответа.',
+     SIZE_BUCKETS, 'size'),
+)
+SLOW_REQUEST_SQL_LIMIT = 20
+
+
+class RequestMetrics:
+    def __init__(self, collect_sql):
+        self.wall_time = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.serializer_time = 0.0
+        self.size = 0
+        self.sql = [] if collect_sql else None
+
+
+# Замеры текущего запроса; None, если запрос не попал в выборку.
+_request_metrics = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def format_labels(labels):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+
+
+class MetricsRegistry:
+    """Гистограммы по маршрутам в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, route, method, request_metrics):
+        with self.lock:
+            for name, _, buckets, attribute in METRICS:
+                key = (name, route, method)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(buckets)
+                histogram.observe(getattr(request_metrics, attribute))
+
+    def render(self):
+        """Текстовый формат Prometheus."""
+        with self.lock:
+            snapshot = {
+                key: (list(histogram.counts), histogram.sum, histogram.count)
+                for key, histogram in self.histograms.items()
+            }
+        lines = []
+        for name, description, buckets, _ in METRICS:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, route, method), (counts, total, count) in sorted(
+                snapshot.items()
+            ):
+                if metric != name:
+                    continue
+                labels = (('route', route), ('method', method))
+                cumulative = 0
+                for bound, bucket_count in zip(
+                    buckets + ('+Inf',), counts
+                ):
+                    cumulative += bucket_count
+                    bucket_labels = format_labels(labels + (('le', bound),))
+                    lines.append(f'{name}_bucket{{{bucket_labels}}} '
+                                 f'{cumulative}')
+                lines.append(f'{name}_sum{{{format_labels(labels)}}} {total}')
+                lines.append(
+                    f'{name}_count{{{format_labels(labels)}}} {count}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    state = _request_metrics.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        state.queries += 1
+        state.db_time += duration
+        if state.sql is not None:
+            state.sql.append((duration, sql))
+
+
+def install_query_recorder(connection, **kwargs):
+    """Подключает учёт SQL-запросов к новому соединению с базой."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializer_timer():
+    state = _request_metrics.get()
+    if state is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        state.serializer_time += time.perf_counter() - started
+
+
+class SerializerMetricsMixin:
+    """Учитывает время to_representation сериализатора представления."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if _request_metrics.get() is not None:
+            to_representation = serializer.to_representation
+
+            def timed_to_representation(instance):
+                with serializer_timer():
+                    return to_representation(instance)
+
+            serializer.to_representation = timed_to_representation
+        return serializer
+
+
+class MetricsMiddleware:
+    """Собирает замеры для доли METRICS_SAMPLE_RATE запросов (WSGI и ASGI).
+
+    Маршрут определяется по имени URL (title-list, reviews-detail и т.д.).
+    Запросы дольше METRICS_SLOW_REQUEST_MS пишутся в лог вместе с SQL.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.METRICS_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Как в MiddlewareMixin: Django вызовет экземпляр через await.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        state = self.new_state()
+        token = _request_metrics.set(state)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self.observe(request, response, state, started)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+        state = self.new_state()
+        token = _request_metrics.set(state)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self.observe(request, response, state, started)
+
+    def new_state(self):
+        return RequestMetrics(
+            collect_sql=settings.METRICS_SLOW_REQUEST_MS is not None
+        )
+
+    def observe(self, request, response, state, started):
+        state.wall_time = time.perf_counter() - started
+        if not response.streaming:
+            state.size = len(response.content)
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else 'unmatched'
+        registry.observe(route, request.method, state)
+        if (
+            state.sql is not None
+            and state.wall_time * 1000 >= settings.METRICS_SLOW_REQUEST_MS
+        ):
+            self.log_slow_request(request, route, state)
+        return response
+
+    def log_slow_request(self, request, route, state):
+        slowest = sorted(state.sql, reverse=True)[:SLOW_REQUEST_SQL_LIMIT]
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.1f мс, SQL: %d за %.1f мс\n%s',
+            request.method,
+            request.get_full_path(),
+            route,
+            state.wall_time * 1000,
+            state.queries,
+            state.db_time * 1000,
+            '\n'.join(
+                f'{duration * 1000:.1f} мс: {sql}'
+                for duration, sql in slowest
+            )
+        )
+
+
+def metrics_allowed(request):
+    """Доступ с адресов METRICS_ALLOWED_IPS или с токеном METRICS_TOKEN."""
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(
+        request.headers.get('Authorization', ''),
+        f'Bearer {settings.METRICS_TOKEN}'
+    )
+
+
+def metrics_view(request):
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
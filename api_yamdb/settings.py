@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'api_yamdb',
     'rest_framework',
     'reviews',
@@ -27,7 +28,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'api_yamdb.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api_yamdb.db.PrimaryReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,6 +60,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Асинхронные представления для произведений, отзывов и комментариев;
+# включаются в api_yamdb/asgi.py.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', default='False') == 'True'
+
+
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', default='60')
 
 DATABASES = {
     'default': {
@@ -65,9 +74,83 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Время жизни соединения в секундах: 0 — закрывать после каждого
+        # запроса, None — без ограничения.
+        'CONN_MAX_AGE': (
+            None if DB_CONN_MAX_AGE == 'None' else int(DB_CONN_MAX_AGE)
+        ),
+        # Режим пулера pgbouncer (pool_mode = transaction): курсоры на
+        # стороне сервера не переживают смену серверного соединения.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_PGBOUNCER', default='False') == 'True'
+        ),
+    }
+}
+
+# Реплики только для чтения: DB_REPLICA_HOSTS=replica1,replica2:5433
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')), 1
+):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['api_yamdb.db.PrimaryReplicaRouter']
+
+# Сколько секунд после записи чтения пользователя идут в основную базу.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', default=5))
+
+# Проверять сохранённые соединения в начале запроса (SELECT 1).
+DB_CONN_HEALTH_CHECKS = (
+    os.getenv('DB_CONN_HEALTH_CHECKS', default='True') == 'True'
+)
+
+if os.getenv('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
-} 
+
+# Лимиты регистрации и получения токена: корзина токенов «N/период» на
+# IP и на значение поля запроса; None отключает ограничение по ключу.
+AUTH_THROTTLE_RATES = {
+    'signup': {'ip': '20/hour', 'username': '5/hour', 'email': '5/hour'},
+    'token': {'ip': '60/min', 'username': '10/min'},
+}
+# api.throttling.LocMemBucketStore — в памяти процесса,
+# api.throttling.RedisBucketStore — общий для воркеров через Redis.
+THROTTLE_STORE = os.getenv(
+    'THROTTLE_STORE', default='api.throttling.LocMemBucketStore'
+)
+THROTTLE_REDIS_URL = os.getenv(
+    'THROTTLE_REDIS_URL', default=os.getenv('CACHE_REDIS_URL')
+)
+
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', default='default')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+API_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('API_COUNT_CACHE_TIMEOUT', default=30)
+)
+API_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv('API_COUNT_ESTIMATE_THRESHOLD', default=100000)
+)
+# Максимальное количество объектов в одном запросе к /bulk/.
+API_BULK_MAX_ITEMS = int(os.getenv('API_BULK_MAX_ITEMS', default=1000))
 
 # Password validation
 
@@ -102,16 +185,41 @@ USE_TZ = True
 
 
 # Static files (CSS, JavaScript, Images)
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend'
+)
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
-EMAIL_HOST = 'smtp.mail.ru'
-EMAIL_PORT = '2525'
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.getenv('EMAIL_HOST', default='smtp.mail.ru')
+EMAIL_PORT = os.getenv('EMAIL_PORT', default='2525')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', default='True') == 'True'
 EMAIL_USE_SSL = False
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
+MAIL_QUEUE_WORKERS = int(os.getenv('MAIL_QUEUE_WORKERS', default=2))
+MAIL_QUEUE_BATCH_SIZE = int(os.getenv('MAIL_QUEUE_BATCH_SIZE', default=50))
+MAIL_QUEUE_MAX_RETRIES = int(os.getenv('MAIL_QUEUE_MAX_RETRIES', default=5))
+MAIL_QUEUE_RETRY_DELAY = float(os.getenv('MAIL_QUEUE_RETRY_DELAY', default=1))
+MAIL_QUEUE_EXIT_TIMEOUT = 10
+
+# Доля запросов, для которых собираются метрики (0 — сбор выключен).
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', default=1))
+# Порог в мс для записи запроса с его SQL в лог; пусто — не писать.
+METRICS_SLOW_REQUEST_MS = (
+    float(os.getenv('METRICS_SLOW_REQUEST_MS'))
+    if os.getenv('METRICS_SLOW_REQUEST_MS') else None
+)
+
+# Доступ к /metrics: адреса клиентов (REMOTE_ADDR) через запятую и/или
+# токен для заголовка «Authorization: Bearer <токен>».
+METRICS_ALLOWED_IPS = [
+    address.strip() for address in os.getenv(
+        'METRICS_ALLOWED_IPS', default='127.0.0.1,::1'
+    ).split(',') if address.strip()
+]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
@@ -122,20 +230,32 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+TOKEN_VERSION_CACHE_TTL = int(os.getenv('TOKEN_VERSION_CACHE_TTL', default=30))
+TOKEN_VERSION_CACHE_SIZE = 10000
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
     'PageNumberPagination',
     "PAGE_SIZE": 5,
+    # Число прокси перед приложением: только тогда IP клиента для
+    # ограничений частоты берётся из X-Forwarded-For.
+    'NUM_PROXIES': (
+        int(os.getenv('NUM_PROXIES')) if os.getenv('NUM_PROXIES') else None
+    ),
 }
 
 
@@ -150,3 +270,19 @@ TITLE_TEXT_LENGTH = 30
 CONFIRMCODE_MAX_LENGTH = 39
 
 UNCORRECT_USERNAME_CHARS = (r'[^\w.@+-]')
+
+TITLE_SEARCH_CONFIG = 'russian'
+
+# Байесовский рейтинг: сколько «средних» оценок добавляется к каждому
+# произведению, и окно (в днях) для расчёта трендов.
+LEADERBOARD_MIN_REVIEWS = int(
+    os.getenv('LEADERBOARD_MIN_REVIEWS', default=10)
+)
+LEADERBOARD_TRENDING_DAYS = int(
+    os.getenv('LEADERBOARD_TRENDING_DAYS', default=7)
+)
+# Насколько может сдвинуться средняя оценка, прежде чем топ будет
+# пересчитан целиком.
+LEADERBOARD_MEAN_TOLERANCE = float(
+    os.getenv('LEADERBOARD_MEAN_TOLERANCE', default=0.01)
+)
@@ -0,0 +1,82 @@
+"""Сравнение синхронного (WSGI) и асинхронного (ASGI) запуска YaMDb.
+
+Оба сервера должны работать с одной и той же базой, например после
+``python manage.py load_yamdb_data``::
+
+    gunicorn api_yamdb.wsgi:application -w 4 --bind 0:8000
+    gunicorn api_yamdb.asgi:application -w 4 --bind 0:8001 \\
+        -k uvicorn.workers.UvicornWorker
+
+    python benchmarks/compare_wsgi_asgi.py \\
+        --wsgi http://127.0.0.1:8000 --asgi http://127.0.0.1:8001
+
+Скрипт параллельно отправляет GET-запросы к спискам и карточкам
+произведений, отзывов и комментариев и печатает пропускную способность
+и перцентили задержки для каждого сервера.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/1/',
+    '/api/v1/titles/1/reviews/',
+    '/api/v1/titles/1/reviews/1/',
+    '/api/v1/titles/1/reviews/1/comments/',
+)
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, int(len(values) * percent / 100))
+    return values[index]
+
+
+def run(base_url, requests_count, concurrency):
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(
+        pool_maxsize=concurrency
+    ))
+
+    def fetch(number):
+        url = base_url + PATHS[number % len(PATHS)]
+        started = time.perf_counter()
+        response = session.get(url)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(fetch, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = sum(1 for _, code in results if code >= 400)
+    return {
+        'rps': requests_count / elapsed,
+        'p50': statistics.median(latencies),
+        'p99': percentile(latencies, 99),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wsgi', default='http://127.0.0.1:8000')
+    parser.add_argument('--asgi', default='http://127.0.0.1:8001')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    print(f'{"":6}{"rps":>10}{"p50, мс":>12}{"p99, мс":>12}{"ошибок":>9}')
+    for name, url in (('WSGI', args.wsgi), ('ASGI', args.asgi)):
+        result = run(url, args.requests, args.concurrency)
+        print(
+            f'{name:6}{result["rps"]:>10.1f}{result["p50"]:>12.1f}'
+            f'{result["p99"]:>12.1f}{result["errors"]:>9}'
+        )
+
+
+if __name__ == '__main__':
+    main()
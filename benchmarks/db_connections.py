@@ -0,0 +1,74 @@
+"""Задержка запроса при разных настройках соединений с базой.
+
+Запросы выполняются тестовым клиентом Django внутри процесса, поэтому
+в замер входят сигналы начала и конца запроса, которые открывают,
+проверяют и закрывают соединения. Используются настройки DB_* из
+окружения; для замера через pgbouncer запустите скрипт повторно с
+DB_PORT пулера и DB_PGBOUNCER=True::
+
+    python benchmarks/db_connections.py --requests 500
+    DB_PORT=6432 DB_PGBOUNCER=True python benchmarks/db_connections.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+
+MODES = (
+    ('без сохранения соединений', 0, False),
+    ('CONN_MAX_AGE=600', 600, False),
+    ('CONN_MAX_AGE=600 + проверка', 600, True),
+)
+
+
+def measure(client, path, requests_count):
+    latencies = []
+    for _ in range(requests_count):
+        started = time.perf_counter()
+        client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return (
+        statistics.mean(latencies),
+        latencies[len(latencies) // 2],
+        latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default='/api/v1/titles/1/reviews/')
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+    client = Client()
+    database = connection.settings_dict
+    print(
+        f'{database["ENGINE"]} {database["HOST"]}:{database["PORT"]}, '
+        'DISABLE_SERVER_SIDE_CURSORS='
+        f'{database["DISABLE_SERVER_SIDE_CURSORS"]}'
+    )
+    print(f'{"":32}{"среднее":>10}{"p50":>10}{"p99":>10}  мс')
+    for name, max_age, health_checks in MODES:
+        connection.close()
+        database['CONN_MAX_AGE'] = max_age
+        settings.DB_CONN_HEALTH_CHECKS = health_checks
+        client.get(args.path)
+        mean, p50, p99 = measure(client, args.path, args.requests)
+        print(f'{name:32}{mean:>10.2f}{p50:>10.2f}{p99:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Задержка и число SQL-запросов по маршрутам API.
+
+Запросы выполняются тестовым клиентом Django внутри процесса по базе из
+настроек DB_*, заполненной, например, синтетическими данными::
+
+    python manage.py generate_yamdb_data --output /tmp/yamdb \\
+        --titles 100000 --users 200000 --reviews 10000000 \\
+        --comments 30000000
+    python manage.py load_yamdb_data --path /tmp/yamdb --copy
+    python benchmarks/routes.py --requests 200
+
+Все запросы выполняются в транзакции, которая в конце откатывается,
+поэтому регистрация и запись администратором не меняют базу. Письма
+отправляются в память, ограничения частоты входа отключены. С --no-cache
+кэш ответов API отключается.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.tokens import default_token_generator  # noqa: E402
+from django.db import connections, transaction  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from api.authentication import get_access_token  # noqa: E402
+from reviews.models import (Category, Genre, Review, Title,  # noqa: E402
+                            User)
+
+
+class Scenario:
+    def __init__(self, name, method, path, data=None, headers=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.headers = headers or {}
+
+    def request(self, client, number):
+        path = self.path(number) if callable(self.path) else self.path
+        data = self.data(number) if callable(self.data) else self.data
+        if self.method == 'get':
+            return client.get(path, data, **self.headers)
+        return getattr(client, self.method)(
+            path, data, content_type='application/json', **self.headers
+        )
+
+
+def build_scenarios():
+    title = Title.objects.order_by('-reviews_count').first()
+    review = Review.objects.annotate(
+        comments_total=Count('comments')
+    ).order_by('-comments_total').first()
+    category = Category.objects.first()
+    genre = Genre.objects.first()
+    user = User.objects.filter(role=User.USER).first()
+    admin = User.objects.filter(role=User.ADMIN).first()
+    if admin is None:
+        admin = User.objects.create(
+            username='benchmark-admin',
+            email='benchmark-admin@yamdb.fake',
+            role=User.ADMIN
+        )
+    if None in (title, review, category, genre, user):
+        sys.exit('В базе нет данных: загрузите их командой load_yamdb_data.')
+    last_page = max(
+        1, -(-Title.objects.count() // settings.REST_FRAMEWORK['PAGE_SIZE'])
+    )
+    admin_headers = {
+        'HTTP_AUTHORIZATION': f'Bearer {get_access_token(admin)}'
+    }
+    reviews = f'/api/v1/titles/{title.pk}/reviews/'
+    comments = (
+        f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+    )
+    return (
+        Scenario('titles', 'get', '/api/v1/titles/'),
+        Scenario('titles ?category', 'get', '/api/v1/titles/',
+                 {'category': category.slug}),
+        Scenario('titles ?genre', 'get', '/api/v1/titles/',
+                 {'genre': genre.slug}),
+        Scenario('titles ?name', 'get', '/api/v1/titles/',
+                 {'name': title.name[:5]}),
+        Scenario('titles ?year', 'get', '/api/v1/titles/',
+                 {'year': title.year}),
+        Scenario('titles ?search', 'get', '/api/v1/titles/',
+                 {'search': title.name.split()[0]}),
+        Scenario('titles ?facets', 'get', '/api/v1/titles/',
+                 {'facets': 'category,genre,year'}),
+        Scenario('titles last page', 'get', '/api/v1/titles/',
+                 {'page': last_page}),
+        Scenario('title detail', 'get', f'/api/v1/titles/{title.pk}/'),
+        Scenario('titles top', 'get', '/api/v1/titles/top/'),
+        Scenario('reviews', 'get', reviews),
+        Scenario('reviews ?cursor', 'get', reviews,
+                 {'pagination': 'cursor'}),
+        Scenario('comments', 'get', comments),
+        Scenario('comments ?cursor', 'get', comments,
+                 {'pagination': 'cursor'}),
+        Scenario('signup', 'post', '/api/v1/auth/signup/', lambda number: {
+            'username': f'benchmark{number}',
+            'email': f'benchmark{number}@yamdb.fake',
+        }),
+        Scenario('token', 'post', '/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        }),
+        Scenario('admin: create title', 'post', '/api/v1/titles/', {
+            'name': 'Бенчмарк',
+            'year': 2000,
+            'category': category.slug,
+            'genre': [genre.slug],
+        }, admin_headers),
+        Scenario('admin: patch title', 'patch',
+                 f'/api/v1/titles/{title.pk}/', {'year': title.year},
+                 admin_headers),
+        Scenario('admin: create genre', 'post', '/api/v1/genres/',
+                 lambda number: {
+                     'name': f'Жанр {number}', 'slug': f'benchmark-{number}'
+                 }, admin_headers),
+    )
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def run(scenario, client, requests_count):
+    latencies, queries, statuses = [], [], set()
+    scenario.request(client, -1)
+    for number in range(requests_count):
+        with ExitStack() as stack:
+            captures = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in settings.DATABASES
+            ]
+            started = time.perf_counter()
+            response = scenario.request(client, number)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(sum(len(capture) for capture in captures))
+        statuses.add(response.status_code)
+    return (
+        statistics.median(latencies),
+        percentile(latencies, 99),
+        statistics.mean(queries),
+        ','.join(map(str, sorted(statuses))),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument(
+        '--only', help='Запускать сценарии, в названии которых есть строка.'
+    )
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    settings.AUTH_THROTTLE_RATES = {}
+    if args.no_cache:
+        settings.CACHES['benchmark'] = {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }
+        settings.API_CACHE_ALIAS = 'benchmark'
+    client = Client()
+    print(f'{"":24}{"p50, мс":>10}{"p99, мс":>10}{"SQL":>8}  статусы')
+    with transaction.atomic():
+        for scenario in build_scenarios():
+            if args.only and args.only not in scenario.name:
+                continue
+            p50, p99, queries, statuses = run(
+                scenario, client, args.requests
+            )
+            print(
+                f'{scenario.name:24}{p50:>10.2f}{p99:>10.2f}'
+                f'{queries:>8.1f}  {statuses}'
+            )
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Сериализация ленты отзывов: ModelSerializer и строки .values().
+
+Скрипт создаёт тестовую базу по настройкам DB_* (её можно не
+подключать к рабочей: подойдёт DB_ENGINE=django.db.backends.sqlite3),
+наполняет её отзывами и сравнивает два пути для одной страницы:
+
+* ReviewSerializer по моделям с select_related('author') + JSONRenderer;
+* строки .values() с JOIN автора + FastJSONRenderer.
+
+Перед замером проверяется, что оба пути дают одинаковые байты (в ленте
+нет чисел с плавающей точкой, в которых вывод orjson отличается)::
+
+    DB_ENGINE=django.db.backends.sqlite3 \\
+        python benchmarks/serialization.py --rows 100 --repeat 300
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.renderers import FastJSONRenderer  # noqa: E402
+from api.serializers import ReviewSerializer  # noqa: E402
+from api.values import (get_values_fields,  # noqa: E402
+                        values_to_representation)
+from reviews.models import Review, Title, User  # noqa: E402
+
+
+def fill(rows):
+    title = Title.objects.create(name='Произведение', year=2000)
+    for number in range(rows):
+        user = User.objects.create(
+            username=f'user{number}', email=f'user{number}@yamdb.ru'
+        )
+        Review.objects.create(
+            title=title,
+            author=user,
+            text=f'Отзыв номер {number} — «кавычки» и "экранирование"',
+            score=number % 10 + 1,
+        )
+    return title
+
+
+def model_path(queryset):
+    serializer = ReviewSerializer(
+        queryset.select_related('author'), many=True
+    )
+    return JSONRenderer().render(serializer.data)
+
+
+def values_path(queryset):
+    values_fields = get_values_fields(ReviewSerializer())
+    rows = queryset.values(*{lookup for _, lookup, _ in values_fields})
+    return FastJSONRenderer().render(
+        values_to_representation(rows, values_fields)
+    )
+
+
+def measure(path, queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        path(queryset)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        queryset = fill(args.rows).reviews.all()
+        if model_path(queryset) != values_path(queryset):
+            sys.exit('Ответы ModelSerializer и .values() различаются.')
+        print(f'{args.rows} отзывов, {args.repeat} повторов')
+        print(f'{"":34}{"медиана":>10}{"минимум":>10}  мс')
+        for name, path in (
+            ('ModelSerializer + JSONRenderer', model_path),
+            ('values() + FastJSONRenderer', values_path),
+        ):
+            median, best = measure(path, queryset, args.repeat)
+            print(f'{name:34}{median:>10.2f}{best:>10.2f}')
+    finally:
+        runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
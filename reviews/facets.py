@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Title, TitleFacet
+
+TitleGenre = Title.genre.through
+
+# Фасет -> колонка TitleFacet с ключом.
+FACET_COLUMNS = {
+    'category': 'category_id',
+    'genre': 'genre_id',
+    'year': 'year',
+}
+
+
+def ensure_facets(keys):
+    """Создаёт недостающие строки фасетов с нулевой статистикой.
+
+    Конфликт уникального ключа означает, что строку уже создал другой
+    запрос, поэтому он молча пропускается.
+    """
+    TitleFacet.objects.bulk_create([
+        TitleFacet(
+            titles_count=0, reviews_count=0, score_sum=0,
+            **{FACET_COLUMNS[facet]: value},
+        )
+        for facet, values in keys.items()
+        for value in values if value is not None
+    ], ignore_conflicts=True)
+
+
+def get_contributions(facet, title_ids):
+    """Вклад произведений в строку фасета из внешнего запроса."""
+    if facet == 'genre':
+        rows = TitleGenre.objects.filter(
+            title_id__in=title_ids, genre_id=OuterRef('genre_id')
+        ).values('genre_id').annotate(
+            titles_count=Count('title_id'),
+            reviews_count=Sum('title__reviews_count'),
+            score_sum=Sum('title__score_sum'),
+        )
+    else:
+        column = FACET_COLUMNS[facet]
+        rows = Title.objects.filter(
+            pk__in=title_ids, **{column: OuterRef(column)}
+        ).values(column).annotate(
+            titles_count=Count('pk'),
+            reviews_count=Sum('reviews_count'),
+            score_sum=Sum('score_sum'),
+        )
+    rows = rows.order_by()
+    return {
+        name: Coalesce(Subquery(rows.values(name)), 0)
+        for name in ('titles_count', 'reviews_count', 'score_sum')
+    }
+
+
+def apply_titles_delta(title_ids, sign, keys=None):
+    """Добавляет (sign=1) или вычитает (sign=-1) вклад произведений.
+
+    Вклад читается из текущих строк произведений и их жанров, поэтому
+    вычитать нужно до изменения, а добавлять — после него; недостающие
+    строки фасетов создаёт ensure_facets. keys ограничивает {фасет:
+    ключи}, без него затрагиваются все фасеты произведений. Статистика
+    сдвигается через F(), как и у отзывов, и не затирает параллельные
+    изменения; строки с нулём произведений удаляет полный пересчёт.
+    """
+    title_ids = list(title_ids)
+    if not title_ids:
+        return
+    for facet, column in FACET_COLUMNS.items():
+        if keys is None:
+            if facet == 'genre':
+                values = TitleGenre.objects.filter(
+                    title_id__in=title_ids
+                ).values('genre_id')
+            else:
+                values = Title.objects.filter(
+                    pk__in=title_ids
+                ).values(column)
+        else:
+            values = [
+                value for value in keys.get(facet, ()) if value is not None
+            ]
+            if not values:
+                continue
+        delta = get_contributions(facet, title_ids)
+        count = F('reviews_count') + sign * delta['reviews_count']
+        score_sum = F('score_sum') + sign * delta['score_sum']
+        TitleFacet.objects.filter(**{f'{column}__in': values}).update(
+            titles_count=F('titles_count') + sign * delta['titles_count'],
+            reviews_count=count,
+            score_sum=score_sum,
+            rating=Cast(score_sum, FloatField()) / NullIf(count, 0),
+        )
+
+
+def aggregate_facet(facet):
+    """Строки (ключ, произведений, отзывов, сумма оценок) по фасету."""
+    if facet == 'genre':
+        queryset = TitleGenre.objects.values(key=F('genre_id')).annotate(
+            titles_count=Count('title_id'),
+            reviews_count=Sum('title__reviews_count'),
+            score_sum=Sum('title__score_sum'),
+        )
+    else:
+        queryset = Title.objects.exclude(
+            **{f'{FACET_COLUMNS[facet]}__isnull': True}
+        ).values(key=F(FACET_COLUMNS[facet])).annotate(
+            titles_count=Count('pk'),
+            reviews_count=Sum('reviews_count'),
+            score_sum=Sum('score_sum'),
+        )
+    return queryset.order_by().values_list(
+        'key', 'titles_count', 'reviews_count', 'score_sum'
+    )
+
+
+def refresh_facet(facet):
+    column = FACET_COLUMNS[facet]
+    # Блокировка до агрегата: сдвиги F(), начатые во время пересчёта,
+    # дождутся его и лягут поверх.
+    existing = dict(TitleFacet.objects.select_for_update().exclude(
+        **{f'{column}__isnull': True}
+    ).values_list(column, 'pk'))
+    rows = [
+        TitleFacet(
+            titles_count=titles_count,
+            reviews_count=reviews_count or 0,
+            score_sum=score_sum or 0,
+            rating=score_sum / reviews_count if reviews_count else None,
+            **{column: key},
+        )
+        for key, titles_count, reviews_count, score_sum
+        in aggregate_facet(facet)
+    ]
+    for row in rows:
+        row.pk = existing.pop(getattr(row, column), None)
+    if existing:
+        # Ключи, у которых не осталось произведений.
+        TitleFacet.objects.filter(pk__in=existing.values()).delete()
+    TitleFacet.objects.bulk_update(
+        [row for row in rows if row.pk is not None],
+        ('titles_count', 'reviews_count', 'score_sum', 'rating')
+    )
+    TitleFacet.objects.bulk_create([row for row in rows if row.pk is None])
+    return len(rows)
+
+
+def refresh_facets():
+    """Полностью пересчитывает статистику фасетов, возвращает число строк.
+
+    Отзывы и произведения сдвигают статистику сразу
+    (TitleFacet.apply_review_delta, apply_titles_delta); пересчёт
+    исправляет расхождения и удаляет строки без произведений.
+    """
+    count = 0
+    with transaction.atomic():
+        for facet in FACET_COLUMNS:
+            count += refresh_facet(facet)
+    return count
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from .models import Review, Title, TitleLeaderboard
+
+CHUNK_SIZE = 1000
+
+
+def weighted_rating(reviews_count, score_sum, mean, min_reviews):
+    """Байесовский рейтинг, сдвинутый к средней оценке по всем отзывам."""
+    return (score_sum + min_reviews * mean) / (reviews_count + min_reviews)
+
+
+def get_changed_title_ids(since, window_start):
+    """Произведения, чья позиция могла измениться с прошлого пересчёта."""
+    changed = set(
+        Review.objects.filter(pub_date__gt=since)
+        .order_by().values_list('title_id', flat=True).distinct()
+    )
+    changed.update(
+        TitleLeaderboard.objects.filter(
+            ~Q(reviews_count=F('title__reviews_count'))
+            | ~Q(score_sum=F('title__score_sum'))
+            | Q(recent_reviews__gt=0)
+        ).values_list('title_id', flat=True)
+    )
+    return changed
+
+
+def refresh_leaderboard(full=False):
+    """Пересчитывает топ произведений и возвращает число изменённых строк.
+
+    Без full обрабатываются только произведения с новыми отзывами после
+    прошлого запуска, с изменившимися оценками и с отзывами за период
+    трендов (окно сдвигается со временем). Если средняя оценка по всем
+    отзывам ушла от сохранённой в строках дальше, чем на
+    LEADERBOARD_MEAN_TOLERANCE, пересчитываются все произведения.
+    """
+    now = timezone.now()
+    window = timedelta(days=settings.LEADERBOARD_TRENDING_DAYS)
+    window_start = now - window
+    last_run = TitleLeaderboard.objects.aggregate(
+        last_run=Max('refreshed_at')
+    )['last_run']
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), reviews_count=Sum('reviews_count')
+    )
+    mean = (
+        totals['score_sum'] / totals['reviews_count']
+        if totals['reviews_count'] else 0
+    )
+    # Рейтинги строк сравнимы, только пока посчитаны с близкой средней.
+    tolerance = settings.LEADERBOARD_MEAN_TOLERANCE
+    if not full and TitleLeaderboard.objects.exclude(
+        mean__range=(mean - tolerance, mean + tolerance)
+    ).exists():
+        full = True
+    if full or last_run is None:
+        title_ids = set(
+            Title.objects.filter(reviews_count__gt=0)
+            .values_list('pk', flat=True)
+        )
+        title_ids.update(
+            TitleLeaderboard.objects.values_list('title_id', flat=True)
+        )
+    else:
+        title_ids = get_changed_title_ids(last_run, window_start)
+    title_ids = sorted(title_ids)
+    for start in range(0, len(title_ids), CHUNK_SIZE):
+        refresh_chunk(
+            title_ids[start:start + CHUNK_SIZE], now, window_start, mean
+        )
+    return len(title_ids)
+
+
+def refresh_chunk(title_ids, now, window_start, mean):
+    min_reviews = settings.LEADERBOARD_MIN_REVIEWS
+    days = settings.LEADERBOARD_TRENDING_DAYS
+    recent = dict(
+        Review.objects.filter(
+            title_id__in=title_ids, pub_date__gte=window_start
+        ).order_by().values('title_id').annotate(count=Count('pk'))
+        .values_list('title_id', 'count')
+    )
+    rows = [
+        TitleLeaderboard(
+            title_id=title_id,
+            reviews_count=reviews_count,
+            score_sum=score_sum,
+            weighted_rating=weighted_rating(
+                reviews_count, score_sum, mean, min_reviews
+            ),
+            recent_reviews=recent.get(title_id, 0),
+            trending_score=recent.get(title_id, 0) / days,
+            mean=mean,
+            refreshed_at=now,
+        )
+        for title_id, reviews_count, score_sum in Title.objects.filter(
+            pk__in=title_ids, reviews_count__gt=0
+        ).values_list('pk', 'reviews_count', 'score_sum')
+    ]
+    with transaction.atomic():
+        existing = set(
+            TitleLeaderboard.objects.filter(title_id__in=title_ids)
+            .values_list('title_id', flat=True)
+        )
+        TitleLeaderboard.objects.filter(title_id__in=title_ids).exclude(
+            title_id__in=[row.title_id for row in rows]
+        ).delete()
+        TitleLeaderboard.objects.bulk_update(
+            [row for row in rows if row.title_id in existing],
+            (
+                'reviews_count', 'score_sum', 'weighted_rating',
+                'recent_reviews', 'trending_score', 'mean', 'refreshed_at',
+            )
+        )
+        TitleLeaderboard.objects.bulk_create(
+            [row for row in rows if row.title_id not in existing]
+        )
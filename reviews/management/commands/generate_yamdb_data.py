@@ -0,0 +1,253 @@
+import bisect
+import csv
+import math
+import random
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .load_yamdb_data import DATA_DIR
+
+FIRST_DATE = datetime(2018, 1, 1, tzinfo=timezone.utc)
+DATE_SPAN = 5 * 365 * 24 * 3600
+COMMENT_DELAY = 30 * 24 * 3600
+# Оценки смещены к высоким, как в исходных данных.
+SCORE_WEIGHTS = (1, 1, 2, 2, 3, 5, 8, 10, 9, 7)
+HASH_MULTIPLIER = 2654435761
+
+
+def harmonic(count, skew):
+    return math.fsum(rank ** -skew for rank in range(1, count + 1))
+
+
+def coprime_step(count):
+    """Шаг, с которым rank -> id перемешивает ранги без повторов."""
+    step = max(1, int(count * 0.618)) | 1
+    while math.gcd(step, count) != 1:
+        step += 2
+    return step
+
+
+def format_date(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + (
+        f'{moment.microsecond // 1000:03d}Z'
+    )
+
+
+def review_date(review_id):
+    return FIRST_DATE + timedelta(
+        seconds=review_id * HASH_MULTIPLIER % DATE_SPAN,
+        milliseconds=review_id % 1000
+    )
+
+
+class Generator:
+    def __init__(self, users, skew, seed):
+        self.rng = random.Random(seed)
+        self.users = users
+        self.skew = skew
+        self.score_cumulative = []
+        total = 0
+        for weight in SCORE_WEIGHTS:
+            total += weight
+            self.score_cumulative.append(total)
+
+    def round_count(self, expected):
+        """Округляет вероятностно, сохраняя сумму в среднем."""
+        count = int(expected)
+        if self.rng.random() < expected - count:
+            count += 1
+        return count
+
+    def zipf_rank(self, count):
+        """Ранг от 1 до count с распределением Ципфа."""
+        if count == 1:
+            return 1
+        uniform = self.rng.random()
+        if self.skew == 1:
+            rank = math.exp(uniform * math.log(count + 1))
+        else:
+            power = 1 - self.skew
+            rank = (((count + 1) ** power - 1) * uniform + 1) ** (1 / power)
+        return min(count, int(rank))
+
+    def authors(self, count):
+        """count разных авторов; активные пользователи встречаются чаще."""
+        if count * 2 > self.users:
+            return self.rng.sample(range(1, self.users + 1), count)
+        authors = set()
+        for _ in range(count * 4):
+            if len(authors) == count:
+                break
+            authors.add(self.zipf_rank(self.users))
+        while len(authors) < count:
+            authors.add(self.rng.randint(1, self.users))
+        return list(authors)
+
+    def score(self):
+        value = self.rng.random() * self.score_cumulative[-1]
+        return bisect.bisect_right(self.score_cumulative, value) + 1
+
+    def distribute(self, total, count):
+        """Пары (id, количество) с перекосом по Ципфу и перемешанными id."""
+        norm = harmonic(count, self.skew)
+        step = coprime_step(count)
+        overflow = 0
+        for rank in range(1, count + 1):
+            amount = self.round_count(
+                total * rank ** -self.skew / norm + overflow
+            )
+            # Сверх числа авторов не поместится: остаток уходит дальше.
+            overflow = max(0, amount - self.users)
+            yield (rank - 1) * step % count + 1, amount - overflow
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует CSV-файлы в формате static/data заданного размера для '
+        'нагрузочного тестирования; загружаются командой load_yamdb_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='generated_data')
+        parser.add_argument(
+            '--source',
+            default=DATA_DIR,
+            help='Каталог с исходными CSV: категории, жанры и тексты.'
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель распределения Ципфа для популярности.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        output = Path(options['output'])
+        if not source.is_dir():
+            raise CommandError(f'Каталог {source} не найден.')
+        if min(options['titles'], options['users']) < 1:
+            raise CommandError('Нужно хотя бы одно произведение и автор.')
+        output.mkdir(parents=True, exist_ok=True)
+        self.generator = Generator(
+            options['users'], options['skew'], options['seed']
+        )
+        for filename in ('category.csv', 'genre.csv'):
+            shutil.copy(source / filename, output / filename)
+        category_ids = self.read_ids(source / 'category.csv')
+        genre_ids = self.read_ids(source / 'genre.csv')
+        self.review_texts = self.read_texts(source / 'review.csv')
+        self.comment_texts = self.read_texts(source / 'comments.csv')
+        self.title_names = self.read_texts(source / 'titles.csv', 'name')
+        self.write(output / 'users.csv', (
+            'id', 'username', 'email', 'role', 'bio', 'first_name',
+            'last_name'
+        ), self.build_users(options['users']))
+        self.write(output / 'titles.csv', ('id', 'name', 'year', 'category'),
+                   self.build_titles(options['titles'], category_ids))
+        self.write(output / 'genre_title.csv', ('id', 'title_id', 'genre_id'),
+                   self.build_title_genres(options['titles'], genre_ids))
+        self.reviews_written = 0
+        self.write(output / 'review.csv', (
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ), self.build_reviews(options['titles'], options['reviews']))
+        self.write(output / 'comments.csv', (
+            'id', 'review_id', 'text', 'author', 'pub_date'
+        ), self.build_comments(options['comments']))
+
+    def read_ids(self, path):
+        with open(path, encoding='utf-8', newline='') as csvfile:
+            return [int(row['id']) for row in csv.DictReader(csvfile)]
+
+    def read_texts(self, path, column='text'):
+        if not path.exists():
+            return ['Текст']
+        with open(path, encoding='utf-8', newline='') as csvfile:
+            return [row[column] for row in csv.DictReader(csvfile)] or [
+                'Текст'
+            ]
+
+    def write(self, path, header, rows):
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'{path.name}: {count} строк'))
+
+    def build_users(self, count):
+        for user_id in range(1, count + 1):
+            role = 'user'
+            if user_id == 1:
+                role = 'admin'
+            elif user_id % 100 == 0:
+                role = 'moderator'
+            yield (
+                user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                role, '', '', ''
+            )
+
+    def build_titles(self, count, category_ids):
+        rng = self.generator.rng
+        for title_id in range(1, count + 1):
+            yield (
+                title_id,
+                f'{rng.choice(self.title_names).strip()} {title_id}',
+                2022 - int(rng.expovariate(1 / 15)) % 120,
+                rng.choice(category_ids),
+            )
+
+    def build_title_genres(self, count, genre_ids):
+        rng = self.generator.rng
+        row_id = 0
+        for title_id in range(1, count + 1):
+            size = min(len(genre_ids), rng.choice((1, 1, 2, 2, 3)))
+            for genre_id in rng.sample(genre_ids, size):
+                row_id += 1
+                yield row_id, title_id, genre_id
+
+    def build_reviews(self, titles, total):
+        generator = self.generator
+        review_id = 0
+        for title_id, count in generator.distribute(total, titles):
+            for author in generator.authors(count):
+                review_id += 1
+                yield (
+                    review_id,
+                    title_id,
+                    generator.rng.choice(self.review_texts),
+                    author,
+                    generator.score(),
+                    format_date(review_date(review_id)),
+                )
+        self.reviews_written = review_id
+
+    def build_comments(self, total):
+        if not self.reviews_written:
+            return
+        generator = self.generator
+        comment_id = 0
+        for review_id, count in generator.distribute(
+            total, self.reviews_written
+        ):
+            published = review_date(review_id)
+            for author in generator.authors(count):
+                comment_id += 1
+                delay = comment_id * HASH_MULTIPLIER % COMMENT_DELAY
+                yield (
+                    comment_id,
+                    review_id,
+                    generator.rng.choice(self.comment_texts),
+                    author,
+                    format_date(published + timedelta(seconds=delay)),
+                )
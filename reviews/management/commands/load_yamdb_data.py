@@ -0,0 +1,413 @@
+import csv
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+DATA_DIR = Path(settings.BASE_DIR) / 'static' / 'data'
+CHUNK_SIZE = 5000
+
+TitleGenre = Title.genre.through
+
+INTEGER_PATTERN = r'^\d{1,18}$'
+DATETIME_PATTERN = r'^\d{4}-\d{2}-\d{2}'
+
+# Колонки таблицы: (колонка CSV, тип, модель для проверки внешнего ключа).
+COPY_SPECS = {
+    TitleGenre: {
+        'id': ('id', 'bigint', None),
+        'title_id': ('title_id', 'bigint', Title),
+        'genre_id': ('genre_id', 'bigint', Genre),
+    },
+    Review: {
+        'id': ('id', 'bigint', None),
+        'title_id': ('title_id', 'bigint', Title),
+        'author_id': ('author', 'bigint', User),
+        'text': ('text', 'text', None),
+        'score': ('score', 'bigint', None),
+        'pub_date': ('pub_date', 'timestamptz', None),
+        'updated_at': ('pub_date', 'timestamptz', None),
+    },
+    Comment: {
+        'id': ('id', 'bigint', None),
+        'review_id': ('review_id', 'bigint', Review),
+        'author_id': ('author', 'bigint', User),
+        'text': ('text', 'text', None),
+        'pub_date': ('pub_date', 'timestamptz', None),
+        'updated_at': ('pub_date', 'timestamptz', None),
+    },
+}
+COPY_CHECKS = {
+    Review: ('score BETWEEN 1 AND 10',),
+}
+# Уникальные ключи таблицы: повтор в файле или в базе отклоняет строку.
+COPY_UNIQUE = {
+    TitleGenre: (('id',), ('title_id', 'genre_id')),
+    Review: (('id',), ('title_id', 'author_id')),
+    Comment: (('id',), ('review_id', 'author_id')),
+}
+
+
+def read_chunks(path, chunk_size):
+    with open(path, encoding='utf-8', newline='') as csvfile:
+        reader = csv.DictReader(csvfile)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+@contextmanager
+def keep_pub_date(*models):
+    """Сохраняет pub_date из файла вместо auto_now_add при bulk_create."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов static/data в базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=DATA_DIR,
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество строк в одной пачке bulk_create.'
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help=(
+                'Загружать связи жанров, отзывы и комментарии через '
+                'COPY (только PostgreSQL).'
+            )
+        )
+        parser.add_argument(
+            '--rejects-dir',
+            default='.',
+            help='Каталог для отклонённых при загрузке строк.'
+        )
+
+    def get_loaders(self):
+        return (
+            ('category.csv', Category, self.build_category),
+            ('genre.csv', Genre, self.build_genre),
+            ('users.csv', User, self.build_user),
+            ('titles.csv', Title, self.build_title),
+            ('genre_title.csv', TitleGenre, self.build_title_genre),
+            ('review.csv', Review, self.build_review),
+            ('comments.csv', Comment, self.build_comment),
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_dir():
+            raise CommandError(f'Каталог {path} не найден.')
+        self.chunk_size = options['chunk_size']
+        self.rejects_dir = Path(options['rejects_dir'])
+        self.known_ids = {}
+        use_copy = options['copy']
+        if use_copy and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(
+                f'COPY недоступен для {connection.vendor}, '
+                'используется bulk_create.'
+            ))
+            use_copy = False
+        with keep_pub_date(Review, Comment):
+            for filename, model, build in self.get_loaders():
+                if use_copy and model in COPY_SPECS:
+                    self.copy_file(path / filename, model)
+                else:
+                    self.load_file(path / filename, model, build)
+        self.reset_sequences()
+        call_command('recalculate_ratings', stdout=self.stdout)
+
+    def load_file(self, path, model, build):
+        """Загружает файл пачками через bulk_create(ignore_conflicts=True).
+
+        Загруженными считаются только строки, чьих id не было в базе до
+        пачки и которые появились после неё. Строки, которые не удалось
+        разобрать, и строки, пропущенные из-за конфликта уникальных
+        ключей, выгружаются в rejected_<файл> в каталоге --rejects-dir.
+        """
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f'{path.name}: пропущен'))
+            return
+        rejects_path = self.rejects_dir / f'rejected_{path.name}'
+        loaded = rejected = 0
+        with ExitStack() as stack:
+            writer = None
+            for chunk in read_chunks(path, self.chunk_size):
+                built = [(row, self.build_row(build, row)) for row in chunk]
+                objects = [obj for _, obj in built if obj is not None]
+                pks = [obj.pk for obj in objects]
+                existing = model.objects.filter(pk__in=pks)
+                with transaction.atomic():
+                    before = set(existing.values_list('pk', flat=True))
+                    model.objects.bulk_create(objects, ignore_conflicts=True)
+                    inserted = set(
+                        existing.values_list('pk', flat=True)
+                    ) - before
+                if model in self.known_ids:
+                    self.known_ids[model].update(inserted)
+                rejected_rows = []
+                for row, obj in built:
+                    if obj is not None and obj.pk in inserted:
+                        # Повтор id в пачке вставлен не будет.
+                        inserted.discard(obj.pk)
+                        loaded += 1
+                    else:
+                        rejected_rows.append(row)
+                if not rejected_rows:
+                    continue
+                rejected += len(rejected_rows)
+                if writer is None:
+                    rejects = stack.enter_context(
+                        open(rejects_path, 'w', encoding='utf-8', newline='')
+                    )
+                    writer = csv.DictWriter(rejects, fieldnames=list(chunk[0]))
+                    writer.writeheader()
+                writer.writerows(rejected_rows)
+        message = f'{path.name}: загружено {loaded}, отклонено {rejected}'
+        if rejected:
+            message += f' (см. {rejects_path})'
+        self.stdout.write(self.style.SUCCESS(message))
+
+    @staticmethod
+    def build_row(build, row):
+        try:
+            return build(row)
+        except (TypeError, ValueError):
+            # Нечисловой id, год или оценка.
+            return None
+
+    def copy_file(self, path, model):
+        """Загружает файл через временную таблицу и COPY.
+
+        Строки копируются в staging-таблицу как текст, затем одним
+        запросом приводятся к типам и проверяются (формат, внешние ключи,
+        ограничения модели). Повторы уникальных ключей — уже загруженные
+        или встреченные в файле раньше — тоже отклоняются, а не теряются
+        в ON CONFLICT. Отклонённые строки выгружаются в rejected_<файл>
+        в каталоге --rejects-dir.
+        """
+        if not path.exists():
+            self.stdout.write(self.style.WARNING(f'{path.name}: пропущен'))
+            return
+        with open(path, encoding='utf-8', newline='') as csvfile:
+            header = next(csv.reader(csvfile))
+        spec = COPY_SPECS[model]
+        qn = connection.ops.quote_name
+        staging_columns = ', '.join(qn(name) for name in header)
+        typed_columns = ', '.join(
+            f'{self.cast_sql(qn(source), sql_type)} AS {qn(column)}'
+            for column, (source, sql_type, _) in spec.items()
+        )
+        invalid = [f'{qn(column)} IS NULL' for column in spec]
+        invalid += [
+            f'NOT EXISTS (SELECT 1 FROM {qn(fk_model._meta.db_table)} f '
+            f'WHERE f.id = c.{qn(column)})'
+            for column, (_, _, fk_model) in spec.items()
+            if fk_model is not None
+        ]
+        invalid += [f'NOT ({check})' for check in COPY_CHECKS.get(model, ())]
+        columns = ', '.join(qn(column) for column in spec)
+        rejects_path = self.rejects_dir / f'rejected_{path.name}'
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE yamdb_staging '
+                '(yamdb_line bigserial, '
+                + ', '.join(f'{qn(name)} text' for name in header)
+                + ')'
+            )
+            with open(path, encoding='utf-8', newline='') as csvfile:
+                cursor.copy_expert(
+                    f'COPY yamdb_staging ({staging_columns}) '
+                    'FROM STDIN WITH (FORMAT csv, HEADER true)',
+                    csvfile
+                )
+            cursor.execute(
+                'CREATE TEMP TABLE yamdb_checked AS '
+                f'SELECT yamdb_line, {typed_columns} FROM yamdb_staging'
+            )
+            cursor.execute(
+                'DELETE FROM yamdb_checked c WHERE '
+                + ' OR '.join(invalid)
+            )
+            duplicates = 0
+            for key in COPY_UNIQUE.get(model, ()):
+                cursor.execute(
+                    'DELETE FROM yamdb_checked c WHERE EXISTS (SELECT 1 '
+                    f'FROM {qn(model._meta.db_table)} t WHERE '
+                    + ' AND '.join(
+                        f't.{qn(column)} = c.{qn(column)}' for column in key
+                    ) + ')'
+                )
+                duplicates += cursor.rowcount
+                # Из повторов внутри файла остаётся первая строка.
+                cursor.execute(
+                    'DELETE FROM yamdb_checked WHERE yamdb_line IN ('
+                    'SELECT yamdb_line FROM (SELECT yamdb_line, '
+                    'row_number() OVER (PARTITION BY '
+                    + ', '.join(qn(column) for column in key)
+                    + ' ORDER BY yamdb_line) AS yamdb_number '
+                    'FROM yamdb_checked) n WHERE yamdb_number > 1)'
+                )
+                duplicates += cursor.rowcount
+            rejected_sql = (
+                f'SELECT {staging_columns} FROM yamdb_staging s '
+                'WHERE NOT EXISTS (SELECT 1 FROM yamdb_checked c '
+                'WHERE c.yamdb_line = s.yamdb_line) ORDER BY s.yamdb_line'
+            )
+            cursor.execute(f'SELECT count(*) FROM ({rejected_sql}) r')
+            rejected = cursor.fetchone()[0]
+            if rejected:
+                with open(rejects_path, 'w', encoding='utf-8') as rejects:
+                    cursor.copy_expert(
+                        f'COPY ({rejected_sql}) '
+                        'TO STDOUT WITH (FORMAT csv, HEADER true)',
+                        rejects
+                    )
+            cursor.execute(
+                f'INSERT INTO {qn(model._meta.db_table)} ({columns}) '
+                f'SELECT {columns} FROM yamdb_checked '
+                'ORDER BY yamdb_line ON CONFLICT DO NOTHING'
+            )
+            loaded = cursor.rowcount
+            cursor.execute('DROP TABLE yamdb_checked, yamdb_staging')
+        self.known_ids.pop(model, None)
+        message = f'{path.name}: загружено {loaded}, отклонено {rejected}'
+        if duplicates:
+            message += f', из них повторов ключа {duplicates}'
+        if rejected:
+            message += f' (см. {rejects_path})'
+        self.stdout.write(self.style.SUCCESS(message))
+
+    @staticmethod
+    def cast_sql(column, sql_type):
+        if sql_type == 'bigint':
+            return (
+                f"CASE WHEN {column} ~ '{INTEGER_PATTERN}' "
+                f'THEN {column}::bigint END'
+            )
+        if sql_type == 'timestamptz':
+            return (
+                f"CASE WHEN {column} ~ '{DATETIME_PATTERN}' "
+                f'THEN {column}::timestamptz END'
+            )
+        return column
+
+    def get_known_ids(self, model):
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True).iterator()
+            )
+        return self.known_ids[model]
+
+    def is_known(self, model, pk):
+        return int(pk) in self.get_known_ids(model)
+
+    def reset_sequences(self):
+        sql_list = connection.ops.sequence_reset_sql(
+            no_style(),
+            [Category, Genre, User, Title, TitleGenre, Review, Comment]
+        )
+        with connection.cursor() as cursor:
+            for sql in sql_list:
+                cursor.execute(sql)
+
+    def build_category(self, row):
+        return Category(
+            id=int(row['id']), name=row['name'], slug=row['slug']
+        )
+
+    def build_genre(self, row):
+        return Genre(
+            id=int(row['id']), name=row['name'], slug=row['slug']
+        )
+
+    def build_user(self, row):
+        return User(
+            id=int(row['id']),
+            username=row['username'],
+            email=row['email'],
+            role=row['role'],
+            bio=row['bio'],
+            first_name=row['first_name'],
+            last_name=row['last_name'],
+            password=make_password(None),
+        )
+
+    def build_title(self, row):
+        category_id = row['category'] or None
+        if category_id and not self.is_known(Category, category_id):
+            category_id = None
+        return Title(
+            id=int(row['id']),
+            name=row['name'],
+            year=int(row['year']),
+            category_id=category_id,
+        )
+
+    def build_title_genre(self, row):
+        if not (
+            self.is_known(Title, row['title_id'])
+            and self.is_known(Genre, row['genre_id'])
+        ):
+            return None
+        return TitleGenre(
+            id=int(row['id']),
+            title_id=row['title_id'],
+            genre_id=row['genre_id'],
+        )
+
+    def build_review(self, row):
+        score = int(row['score'])
+        if not (
+            self.is_known(Title, row['title_id'])
+            and self.is_known(User, row['author'])
+            and 1 <= score <= 10
+        ):
+            return None
+        return Review(
+            id=int(row['id']),
+            title_id=row['title_id'],
+            author_id=row['author'],
+            text=row['text'],
+            score=score,
+            pub_date=row['pub_date'],
+        )
+
+    def build_comment(self, row):
+        if not (
+            self.is_known(Review, row['review_id'])
+            and self.is_known(User, row['author'])
+        ):
+            return None
+        return Comment(
+            id=int(row['id']),
+            review_id=row['review_id'],
+            author_id=row['author'],
+            text=row['text'],
+            pub_date=row['pub_date'],
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (Count, FloatField, IntegerField, OuterRef,
+                              Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, Now, NullIf
+
+from reviews.facets import refresh_facets
+from reviews.models import Review, Title
+
+
+def review_aggregate(aggregate):
+    return Coalesce(
+        Subquery(
+            Review.objects.filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+            .annotate(value=aggregate)
+            .values('value'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество отзывов и рейтинг произведений.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            Title.objects.update(
+                reviews_count=review_aggregate(Count('pk')),
+                score_sum=review_aggregate(Sum('score')),
+            )
+            Title.objects.update(
+                rating=Cast('score_sum', FloatField())
+                / NullIf('reviews_count', 0),
+                updated_at=Now()
+            )
+            refresh_facets()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {Title.objects.count()} произведений.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.facets import refresh_facets
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает число произведений, отзывов и среднюю оценку по '
+        'категориям, жанрам и годам.'
+    )
+
+    def handle(self, *args, **options):
+        count = refresh_facets()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано фасетов: {count}.'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboard import refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Обновляет топ и тренды произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать все произведения, а не только изменившиеся.'
+        )
+
+    def handle(self, *args, **options):
+        count = refresh_leaderboard(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано произведений: {count}.'
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 20:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleLeaderboard',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard', serialize=False, to='reviews.title', verbose_name='произведение')),
+                ('reviews_count', models.PositiveIntegerField(verbose_name='количество отзывов')),
+                ('score_sum', models.PositiveIntegerField(verbose_name='сумма оценок')),
+                ('weighted_rating', models.FloatField(db_index=True, verbose_name='взвешенный рейтинг')),
+                ('recent_reviews', models.PositiveIntegerField(default=0, verbose_name='отзывов за период')),
+                ('trending_score', models.FloatField(db_index=True, default=0, verbose_name='отзывов в день за период')),
+                ('refreshed_at', models.DateTimeField(db_index=True, verbose_name='пересчитано')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# Сколько совпадений перечислять в сообщении об ошибке.
+COLLISIONS_SHOWN = 20
+
+
+def check_case_collisions(apps, schema_editor):
+    """Останавливает миграцию, если имена или почты совпадают без регистра.
+
+    Иначе создание уникального индекса по lower() упадёт на середине.
+    Таких пользователей нужно объединить или переименовать вручную.
+    """
+    User = apps.get_model('reviews', 'User')
+    problems = []
+    for field in ('username', 'email'):
+        collisions = User.objects.values(value=Lower(field)).annotate(
+            total=Count('pk')
+        ).filter(total__gt=1).order_by('value')
+        for row in collisions[:COLLISIONS_SHOWN]:
+            values = User.objects.annotate(value=Lower(field)).filter(
+                value=row['value']
+            ).order_by('pk').values_list('pk', field)
+            problems.append('{}: {}'.format(field, ', '.join(
+                f'{value} (id={pk})' for pk, value in values
+            )))
+    if problems:
+        raise RuntimeError(
+            'Пользователи совпадают без учёта регистра, уникальные индексы '
+            'по lower() создать нельзя. Объедините или переименуйте их:\n'
+            + '\n'.join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_case_collisions, migrations.RunPython.noop
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX reviews_user_username_lower_uniq '
+            'ON reviews_user (lower(username))',
+            'DROP INDEX reviews_user_username_lower_uniq',
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX reviews_user_email_lower_uniq '
+            'ON reviews_user (lower(email))',
+            'DROP INDEX reviews_user_email_lower_uniq',
+        ),
+    ]
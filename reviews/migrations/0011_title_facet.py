@@ -0,0 +1,77 @@
+# Generated by Django 3.2 on 2026-10-18 20:39
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+import django.db.models.deletion
+
+
+def fill_title_facets(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleFacet = apps.get_model('reviews', 'TitleFacet')
+    TitleGenre = Title.genre.through
+    sources = {
+        'category_id': Title.objects.exclude(category_id__isnull=True)
+        .values(key=F('category_id')).annotate(
+            titles_count=Count('pk'),
+            reviews_count=Sum('reviews_count'),
+            score_sum=Sum('score_sum'),
+        ),
+        'year': Title.objects.values(key=F('year')).annotate(
+            titles_count=Count('pk'),
+            reviews_count=Sum('reviews_count'),
+            score_sum=Sum('score_sum'),
+        ),
+        'genre_id': TitleGenre.objects.values(key=F('genre_id')).annotate(
+            titles_count=Count('title_id'),
+            reviews_count=Sum('title__reviews_count'),
+            score_sum=Sum('title__score_sum'),
+        ),
+    }
+    for column, rows in sources.items():
+        TitleFacet.objects.bulk_create(
+            (
+                TitleFacet(
+                    titles_count=row['titles_count'],
+                    reviews_count=row['reviews_count'] or 0,
+                    score_sum=row['score_sum'] or 0,
+                    rating=(
+                        row['score_sum'] / row['reviews_count']
+                        if row['reviews_count'] else None
+                    ),
+                    **{column: row['key']},
+                )
+                for row in rows.order_by().iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_user_lower_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(null=True, unique=True, verbose_name='год')),
+                ('titles_count', models.PositiveIntegerField(verbose_name='количество произведений')),
+                ('reviews_count', models.PositiveBigIntegerField(verbose_name='количество отзывов')),
+                ('score_sum', models.PositiveBigIntegerField(verbose_name='сумма оценок')),
+                ('rating', models.FloatField(null=True, verbose_name='средняя оценка')),
+                ('category', models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='facet', to='reviews.category', verbose_name='категория')),
+                ('genre', models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='facet', to='reviews.genre', verbose_name='жанр')),
+            ],
+            options={
+                'verbose_name': 'Статистика по фасету',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlefacet',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('category__isnull', False), ('genre__isnull', True), ('year__isnull', True)), models.Q(('category__isnull', True), ('genre__isnull', False), ('year__isnull', True)), models.Q(('category__isnull', True), ('genre__isnull', True), ('year__isnull', False)), _connector='OR'), name='title_facet_single_key'),
+        ),
+        migrations.RunPython(fill_title_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_facet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='titleleaderboard',
+            name='mean',
+            field=models.FloatField(default=0, verbose_name='средняя оценка при расчёте'),
+        ),
+    ]
@@ -1,7 +1,12 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Now, NullIf
 
 from .validators import validate_year, validate_username
 
@@ -49,10 +54,39 @@ class User(AbstractUser):
         max_length=settings.NAME_MAX_LENGTH,
         blank=True
     )
+    token_version = models.PositiveIntegerField(
+        'версия токена',
+        default=0,
+        editable=False
+    )
+
+    # Поля, которые попадают в токен: их изменение отзывает выданные токены.
+    TOKEN_CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_active')
 
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_claims = instance.get_token_claims()
+        return instance
+
+    def get_token_claims(self):
+        return tuple(
+            self.__dict__.get(field) for field in self.TOKEN_CLAIM_FIELDS
+        )
+
+    def save(self, *args, **kwargs):
+        loaded_claims = getattr(self, '_loaded_claims', None)
+        if loaded_claims and loaded_claims != self.get_token_claims():
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_claims = self.get_token_claims()
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_staff
@@ -94,6 +128,30 @@ class Genre(GenreCategory):
         verbose_name = 'Жанры произведения'
 
 
+# Произведения, удаляемые в текущем контексте: их отзывы удаляются
+# каскадом, и сдвигать агрегаты по каждому отзыву незачем.
+_deleting_titles = ContextVar('deleting_titles', default=frozenset())
+
+
+@contextmanager
+def deleting_titles(title_ids):
+    token = _deleting_titles.set(_deleting_titles.get() | set(title_ids))
+    try:
+        yield
+    finally:
+        _deleting_titles.reset(token)
+
+
+def is_title_deleting(title_id):
+    return title_id in _deleting_titles.get()
+
+
+class TitleQuerySet(models.QuerySet):
+    def delete(self):
+        with deleting_titles(self.values_list('pk', flat=True)):
+            return super().delete()
+
+
 class Title(models.Model):
     name = models.CharField(
         'название',
@@ -122,14 +180,174 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='жанр'
     )
+    reviews_count = models.PositiveIntegerField(
+        'количество отзывов',
+        default=0,
+        editable=False
+    )
+    score_sum = models.PositiveIntegerField(
+        'сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField('изменено', auto_now=True)
+
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Сигналы сдвигают фасеты до и после записи — в одной транзакции.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with deleting_titles([self.pk]):
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'category_id' in instance.__dict__ and 'year' in instance.__dict__:
+            # Прежние ключи фасетов: при сохранении не нужен лишний SELECT.
+            instance._loaded_facet_state = (
+                instance.category_id, instance.year
+            )
+        return instance
+
+    @classmethod
+    def apply_review_delta(cls, title_id, count_delta, score_delta):
+        """Сдвигает сохранённые агрегаты отзывов одним UPDATE."""
+        count = F('reviews_count') + count_delta
+        score_sum = F('score_sum') + score_delta
+        cls.objects.filter(pk=title_id).update(
+            reviews_count=count,
+            score_sum=score_sum,
+            rating=Cast(score_sum, FloatField()) / NullIf(count, 0),
+            updated_at=Now(),
+        )
+        TitleFacet.apply_review_delta(title_id, count_delta, score_delta)
+
     class Meta:
         ordering = ('name',)
 
 
+class TitleLeaderboard(models.Model):
+    """Предрассчитанные позиции произведения в топе и трендах."""
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='leaderboard',
+        verbose_name='произведение'
+    )
+    reviews_count = models.PositiveIntegerField('количество отзывов')
+    score_sum = models.PositiveIntegerField('сумма оценок')
+    weighted_rating = models.FloatField(
+        'взвешенный рейтинг',
+        db_index=True
+    )
+    recent_reviews = models.PositiveIntegerField(
+        'отзывов за период',
+        default=0
+    )
+    trending_score = models.FloatField(
+        'отзывов в день за период',
+        default=0,
+        db_index=True
+    )
+    mean = models.FloatField(
+        'средняя оценка при расчёте',
+        default=0
+    )
+    refreshed_at = models.DateTimeField('пересчитано', db_index=True)
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+
+    def __str__(self):
+        return str(self.title_id)
+
+
+class TitleFacet(models.Model):
+    """Число произведений и отзывов по категории, жанру или году.
+
+    Заполнена ровно одна из колонок category, genre и year.
+    """
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='facet',
+        verbose_name='категория'
+    )
+    genre = models.OneToOneField(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='facet',
+        verbose_name='жанр'
+    )
+    year = models.IntegerField('год', null=True, unique=True)
+    titles_count = models.PositiveIntegerField('количество произведений')
+    reviews_count = models.PositiveBigIntegerField('количество отзывов')
+    score_sum = models.PositiveBigIntegerField('сумма оценок')
+    rating = models.FloatField('средняя оценка', null=True)
+
+    class Meta:
+        verbose_name = 'Статистика по фасету'
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(
+                        category__isnull=False,
+                        genre__isnull=True,
+                        year__isnull=True
+                    )
+                    | models.Q(
+                        category__isnull=True,
+                        genre__isnull=False,
+                        year__isnull=True
+                    )
+                    | models.Q(
+                        category__isnull=True,
+                        genre__isnull=True,
+                        year__isnull=False
+                    )
+                ),
+                name='title_facet_single_key'
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.category_id or self.genre_id or self.year)
+
+    @classmethod
+    def apply_review_delta(cls, title_id, count_delta, score_delta):
+        """Сдвигает статистику всех фасетов произведения одним UPDATE."""
+        title = Title.objects.filter(pk=title_id)
+        count = F('reviews_count') + count_delta
+        score_sum = F('score_sum') + score_delta
+        cls.objects.filter(
+            models.Q(category_id=models.Subquery(title.values('category_id')))
+            | models.Q(year=models.Subquery(title.values('year')))
+            | models.Q(genre_id__in=Title.genre.through.objects.filter(
+                title_id=title_id
+            ).values('genre_id'))
+        ).update(
+            reviews_count=count,
+            score_sum=score_sum,
+            rating=Cast(score_sum, FloatField()) / NullIf(count, 0),
+        )
+
+
 class ReviewComment(models.Model):
     text = models.TextField(
         verbose_name='Текст',
@@ -146,6 +364,10 @@ class ReviewComment(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
 
     def __str__(self):
         return self.text
@@ -174,6 +396,40 @@ class Review(ReviewComment):
         ]
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating_state = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score'),
+        )
+        return instance
+
+    def _get_loaded_rating_state(self):
+        state = getattr(self, '_loaded_rating_state', (None, None))
+        if None in state:
+            state = Review.objects.filter(pk=self.pk).values_list(
+                'title_id', 'score'
+            ).get()
+        return state
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                Title.apply_review_delta(self.title_id, 1, self.score)
+            else:
+                old_title_id, old_score = self._get_loaded_rating_state()
+                super().save(*args, **kwargs)
+                if self.title_id != old_title_id:
+                    Title.apply_review_delta(old_title_id, -1, -old_score)
+                    Title.apply_review_delta(self.title_id, 1, self.score)
+                elif self.score != old_score:
+                    Title.apply_review_delta(
+                        self.title_id, 0, self.score - old_score
+                    )
+        self._loaded_rating_state = (self.title_id, self.score)
+
     class Meta(ReviewComment.Meta):
         constraints = [
             models.UniqueConstraint(
@@ -181,6 +437,12 @@ class Review(ReviewComment):
                 name='Уникальный обзор'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
 
 class Comment(ReviewComment):
@@ -198,3 +460,9 @@ class Comment(ReviewComment):
                 name='Уникальный комментарий'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
@@ -0,0 +1,101 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .facets import apply_titles_delta, ensure_facets
+from .models import Review, Title, is_title_deleting
+
+# Поля Title, от которых зависят фасеты (имена и attname).
+FACET_FIELDS = {'category', 'category_id', 'year'}
+
+
+@receiver(post_delete, sender=Review)
+def decrease_title_rating(sender, instance, **kwargs):
+    if is_title_deleting(instance.title_id):
+        return
+    Title.apply_review_delta(instance.title_id, -1, -instance.score)
+
+
+def facet_fields_saved(update_fields):
+    return update_fields is None or bool(
+        FACET_FIELDS & set(update_fields)
+    )
+
+
+def changed_facet_keys(state, other):
+    """{фасет: {ключ из state}} для категории и года, отличных от other."""
+    return {
+        facet: {value}
+        for facet, value, other_value in zip(
+            ('category', 'year'), state, other
+        )
+        if value != other_value
+    }
+
+
+@receiver(pre_save, sender=Title)
+def subtract_title_facets(sender, instance, update_fields=None, **kwargs):
+    """Вычитает произведение из фасетов, которые оно покидает.
+
+    Без изменений, запомненных from_db, база не читается. Иначе строка
+    блокируется до вычитания, чтобы отзыв не сдвинул прежние фасеты
+    между вычитанием и записью.
+    """
+    if instance.pk is None or not facet_fields_saved(update_fields):
+        return
+    state = (instance.category_id, instance.year)
+    if getattr(instance, '_loaded_facet_state', None) == state:
+        return
+    old_state = Title.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('category_id', 'year').first()
+    instance._loaded_facet_state = old_state
+    if old_state is None:
+        return
+    keys = changed_facet_keys(old_state, state)
+    if keys:
+        apply_titles_delta([instance.pk], -1, keys)
+
+
+@receiver(post_save, sender=Title)
+def add_title_facets(sender, instance, created, update_fields=None,
+                     **kwargs):
+    if not facet_fields_saved(update_fields):
+        return
+    state = (instance.category_id, instance.year)
+    old_state = getattr(instance, '_loaded_facet_state', None)
+    instance._loaded_facet_state = state
+    keys = changed_facet_keys(state, old_state or (None, None))
+    if keys:
+        ensure_facets(keys)
+        apply_titles_delta([instance.pk], 1, keys)
+
+
+@receiver(pre_delete, sender=Title)
+def subtract_deleted_title_facets(sender, instance, **kwargs):
+    # Отзывы и жанры ещё на месте: вклад читается до каскада.
+    apply_titles_delta([instance.pk], -1)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def shift_genre_facets(sender, instance, action, reverse, pk_set,
+                       **kwargs):
+    if action not in ('pre_remove', 'pre_clear', 'post_add'):
+        return
+    if action == 'pre_clear':
+        related = sender.objects.filter(
+            **{'genre_id' if reverse else 'title_id': instance.pk}
+        ).values_list('title_id' if reverse else 'genre_id', flat=True)
+        pk_set = set(related)
+    if reverse:
+        title_ids, genre_ids = pk_set, {instance.pk}
+    else:
+        title_ids, genre_ids = {instance.pk}, pk_set
+    if not pk_set:
+        return
+    keys = {'genre': genre_ids}
+    if action == 'post_add':
+        ensure_facets(keys)
+        apply_titles_delta(title_ids, 1, keys)
+    else:
+        apply_titles_delta(title_ids, -1, keys)
@@ -0,0 +1,122 @@
+from django.db import connections, router
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
+
+from .models import User
+
+CREATED = 'created'
+EXISTING = 'existing'
+USERNAME_TAKEN = 'username_taken'
+EMAIL_TAKEN = 'email_taken'
+
+
+def classify(matches):
+    """Итог регистрации по найденным строкам (статус, пользователь).
+
+    matches — пары ((совпал username, совпал email), пользователь);
+    сравнение без учёта регистра.
+    """
+    for (same_username, same_email), user in matches:
+        if same_username and same_email:
+            return EXISTING, user
+    if any(same_username for (same_username, _), _ in matches):
+        return USERNAME_TAKEN, None
+    return EMAIL_TAKEN, None
+
+
+def signup_postgresql(connection, user):
+    """Поиск и вставка одним запросом, конфликты — без исключений.
+
+    Возвращает (созданный пользователь или None, найденные совпадения).
+    """
+    qn = connection.ops.quote_name
+    opts = User._meta
+    table = qn(opts.db_table)
+    username = qn(opts.get_field('username').column)
+    email = qn(opts.get_field('email').column)
+    fields = [field for field in opts.concrete_fields if not field.primary_key]
+    columns = ', '.join(qn(field.column) for field in opts.concrete_fields)
+    insert_columns = ', '.join(qn(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = f"""
+        WITH existing AS (
+            SELECT lower({username}) = lower(%s) AS same_username,
+                   lower({email}) = lower(%s) AS same_email, {columns}
+            FROM {table}
+            WHERE lower({username}) = lower(%s)
+                OR lower({email}) = lower(%s)
+        ), inserted AS (
+            INSERT INTO {table} ({insert_columns})
+            SELECT {placeholders}
+            WHERE NOT EXISTS (SELECT 1 FROM existing)
+            ON CONFLICT DO NOTHING
+            RETURNING {columns}
+        )
+        SELECT TRUE, TRUE, TRUE, {columns} FROM inserted
+        UNION ALL
+        SELECT FALSE, same_username, same_email, {columns} FROM existing
+    """
+    params = [user.username, user.email] * 2 + [
+        field.get_db_prep_save(field.pre_save(user, True), connection)
+        for field in fields
+    ]
+    field_names = [field.attname for field in opts.concrete_fields]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    created, matches = None, []
+    for inserted, same_username, same_email, *values in rows:
+        instance = User.from_db(connection.alias, field_names, values)
+        if inserted:
+            created = instance
+        else:
+            matches.append(((same_username, same_email), instance))
+    return created, matches
+
+
+def find_matches(db, username, email):
+    users = User.objects.using(db).alias(
+        username_lower=Lower('username'),
+        email_lower=Lower('email'),
+    ).filter(
+        Q(username_lower=Lower(Value(username)))
+        | Q(email_lower=Lower(Value(email)))
+    )
+    return [
+        (
+            (
+                user.username.lower() == username.lower(),
+                user.email.lower() == email.lower(),
+            ),
+            user,
+        )
+        for user in users
+    ]
+
+
+def signup_user(username, email):
+    """Находит или создаёт пользователя для регистрации.
+
+    Возвращает (статус, пользователь): CREATED и EXISTING — с
+    пользователем, USERNAME_TAKEN и EMAIL_TAKEN — с None. Имя и почта
+    сравниваются без учёта регистра (уникальные индексы по lower()).
+    """
+    db = router.db_for_write(User)
+    connection = connections[db]
+    user = User(username=username, email=email)
+    if connection.vendor == 'postgresql':
+        # Пустой результат — гонка с параллельной регистрацией, которая
+        # завершилась после снимка; повтор увидит её строку.
+        for _ in range(2):
+            created, matches = signup_postgresql(connection, user)
+            if created is not None:
+                return CREATED, created
+            if matches:
+                return classify(matches)
+    matches = find_matches(db, username, email)
+    if matches:
+        return classify(matches)
+    User.objects.using(db).bulk_create([user], ignore_conflicts=True)
+    matches = find_matches(db, username, email)
+    status, instance = classify(matches)
+    return (CREATED, instance) if status == EXISTING else (status, None)
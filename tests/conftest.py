@@ -0,0 +1,55 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from api import authentication, throttling
+from api.authentication import get_access_token
+from reviews.models import Category, Genre, User
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Кэш ответов, версии и корзины ограничений не переходят между тестами."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    throttling._store = None
+    authentication._token_versions.clear()
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}')
+    return client
+
+
+@pytest.fixture
+def user():
+    return User.objects.create(username='reader', email='reader@yamdb.fake')
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create(
+        username='chief', email='chief@yamdb.fake', role=User.ADMIN
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    return get_client(user)
+
+
+@pytest.fixture
+def admin_api_client(admin):
+    return get_client(admin)
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genre():
+    return Genre.objects.create(name='Драма', slug='drama')
@@ -0,0 +1,53 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication
+from reviews.models import User
+
+URL = '/api/v1/users/me/'
+
+
+def expire_token_versions():
+    """Как в другом процессе: запись кэша версий дожила до конца TTL."""
+    for user_id, (version, _) in authentication._token_versions.items():
+        authentication._token_versions[user_id] = (version, 0)
+
+
+def remember_token_version(user_id, version):
+    """Как в другом процессе: версия закэширована до изменения."""
+    authentication._token_versions[user_id] = (version, float('inf'))
+
+
+@pytest.mark.parametrize('field, value', (
+    ('role', User.MODERATOR),
+    ('is_active', False),
+))
+@pytest.mark.django_db
+def test_claim_change_rejects_old_token(user, user_client, field, value):
+    assert user_client.get(URL).status_code == 200
+    stored = User.objects.get(pk=user.pk)
+    setattr(stored, field, value)
+    stored.save()
+    assert stored.token_version == user.token_version + 1
+    remember_token_version(user.pk, user.token_version)
+    assert user_client.get(URL).status_code == 200
+    expire_token_versions()
+    response = user_client.get(URL)
+    assert response.status_code == 401
+    assert response.data['detail'].code == 'token_outdated'
+
+
+@pytest.mark.django_db
+def test_token_without_version_checks_database(user,
+                                               django_assert_num_queries):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    # Пользователь из базы и его запись для /me/.
+    with django_assert_num_queries(2):
+        assert client.get(URL).status_code == 200
+    # Без версии в токене отключение действует сразу.
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    assert client.get(URL).status_code == 401
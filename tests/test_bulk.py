@@ -0,0 +1,49 @@
+import pytest
+
+from reviews.models import Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.mark.django_db
+def test_bulk_titles_reports_repeated_ids(admin_api_client, category, genre):
+    title = Title.objects.create(name='Старое', year=2000, category=category)
+    item = {
+        'id': title.pk,
+        'name': 'Новое',
+        'year': 2001,
+        'category': category.slug,
+        'genre': [genre.slug],
+    }
+    response = admin_api_client.post(URL, [item, item], format='json')
+    assert response.status_code == 200
+    assert response.data['updated'] == [title.pk]
+    assert response.data['errors'] == [
+        {'index': 1, 'errors': {'id': ['Повторяется в запросе.']}}
+    ]
+    assert list(title.genre.all()) == [genre]
+
+
+@pytest.mark.django_db
+def test_bulk_titles_ignores_repeated_genres(admin_api_client, category,
+                                             genre):
+    title = Title.objects.create(name='Старое', year=2000, category=category)
+    response = admin_api_client.post(URL, [
+        {
+            'name': 'Новое',
+            'year': 2001,
+            'category': category.slug,
+            'genre': [genre.slug, genre.slug],
+        },
+        {
+            'id': title.pk,
+            'name': 'Старое',
+            'year': 2000,
+            'category': category.slug,
+            'genre': [genre.slug, genre.slug],
+        },
+    ], format='json')
+    assert response.status_code == 200
+    assert response.data['errors'] == []
+    for pk in response.data['created'] + response.data['updated']:
+        assert list(Title.objects.get(pk=pk).genre.all()) == [genre]
@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.fixture
+def title(category):
+    return Title.objects.create(
+        name='Произведение', year=2000, category=category
+    )
+
+
+@pytest.fixture
+def reviews(title, user):
+    other = User.objects.create(username='writer', email='writer@yamdb.fake')
+    return [
+        Review.objects.create(title=title, author=author, text=text, score=5)
+        for author, text in ((user, 'Первый'), (other, 'Второй'))
+    ]
+
+
+def feed_url(title):
+    return f'/api/v1/titles/{title.pk}/reviews/'
+
+
+@pytest.mark.django_db
+def test_feed_not_modified(client, title, reviews):
+    response = client.get(feed_url(title))
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response
+    response = client.get(
+        feed_url(title), HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_feed_modified_after_deleting_oldest(client, title, reviews):
+    response = client.get(feed_url(title))
+    etag = response['ETag']
+    reviews[0].delete()
+    response = client.get(feed_url(title), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    # Без Last-Modified одна дата не даёт устаревшего 304.
+    response = client.get(
+        feed_url(title),
+        HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_feed_modified_after_edit(client, title, reviews):
+    etag = client.get(feed_url(title))['ETag']
+    reviews[0].text = 'Исправлено'
+    reviews[0].save()
+    response = client.get(feed_url(title), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_comment_feed_modified_after_delete(client, title, reviews, user):
+    review = reviews[1]
+    comment = Comment.objects.create(review=review, author=user, text='К')
+    url = f'{feed_url(title)}{review.pk}/comments/'
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    comment.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_deleted_title_feed_not_found(client, title, reviews):
+    etag = client.get(feed_url(title))['ETag']
+    url = feed_url(title)
+    title.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+@pytest.mark.django_db
+def test_cursor_feed_does_not_count(client, title, reviews):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(
+            feed_url(title), {'pagination': 'cursor'},
+            HTTP_IF_NONE_MATCH='"stale"'
+        )
+    assert response.status_code == 200
+    assert not any(
+        'COUNT(' in query['sql'].upper() for query in context.captured_queries
+    )
@@ -0,0 +1,174 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.facets import refresh_facets
+from reviews.models import Category, Genre, Review, Title, TitleFacet, User
+
+
+def snapshot():
+    # Строки без произведений остаются до полного пересчёта.
+    return sorted(
+        TitleFacet.objects.filter(titles_count__gt=0).values_list(
+            'category_id', 'genre_id', 'year', 'titles_count',
+            'reviews_count', 'score_sum', 'rating'
+        ),
+        key=repr
+    )
+
+
+def assert_consistent():
+    """Статистика после инкрементальных обновлений равна полному пересчёту."""
+    incremental = snapshot()
+    refresh_facets()
+    assert incremental == snapshot()
+
+
+@pytest.fixture
+def catalog(category, genre):
+    other_category = Category.objects.create(name='Книга', slug='book')
+    other_genre = Genre.objects.create(name='Комедия', slug='comedy')
+    first = Title.objects.create(name='Первое', year=2000, category=category)
+    first.genre.set([genre, other_genre])
+    second = Title.objects.create(
+        name='Второе', year=2001, category=other_category
+    )
+    second.genre.set([genre])
+    authors = [
+        User.objects.create(
+            username=f'author{number}', email=f'author{number}@yamdb.fake'
+        )
+        for number in range(3)
+    ]
+    for number, author in enumerate(authors):
+        Review.objects.create(
+            title=first, author=author, text='Отзыв', score=number + 4
+        )
+    Review.objects.create(
+        title=second, author=authors[0], text='Отзыв', score=9
+    )
+    return first, second, other_category, other_genre
+
+
+@pytest.mark.django_db
+def test_facets_after_creates(catalog, genre):
+    assert_consistent()
+    facet = TitleFacet.objects.get(genre=genre)
+    assert (facet.titles_count, facet.reviews_count, facet.score_sum) == (
+        2, 4, 24
+    )
+    assert facet.rating == 6
+
+
+@pytest.mark.django_db
+def test_facets_after_review_changes(catalog):
+    first, second, *_ = catalog
+    review = Review.objects.filter(title=first).first()
+    review.score = 10
+    review.save()
+    assert_consistent()
+    review.delete()
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_facets_after_title_updates(catalog, genre):
+    first, second, other_category, other_genre = catalog
+    first.refresh_from_db()
+    first.category = other_category
+    first.year = 2001
+    first.save()
+    assert_consistent()
+    first.genre.remove(other_genre)
+    assert_consistent()
+    first.genre.clear()
+    assert_consistent()
+    genre.titles.add(first)
+    assert_consistent()
+
+
+@pytest.mark.django_db
+def test_facets_after_title_deletes(catalog, category):
+    first, second, *_ = catalog
+    first.delete()
+    assert_consistent()
+    assert not TitleFacet.objects.filter(
+        category=category, titles_count__gt=0
+    ).exists()
+    Title.objects.all().delete()
+    assert not TitleFacet.objects.filter(titles_count__gt=0).exists()
+    assert_consistent()
+    assert not TitleFacet.objects.exists()
+
+
+@pytest.mark.django_db
+def test_title_save_without_facet_changes_skips_refresh(
+    catalog, django_assert_num_queries
+):
+    title = Title.objects.get(pk=catalog[0].pk)
+    title.name = 'Переименовано'
+    with django_assert_num_queries(1):
+        title.save()
+
+
+@pytest.mark.django_db
+def test_titles_list_facets(client, catalog, category, genre):
+    response = client.get('/api/v1/titles/', {'facets': 'category,genre'})
+    assert response.status_code == 200
+    facets = response.json()['facets']
+    assert set(facets) == {'category', 'genre'}
+    counts = {item['slug']: item['titles_count'] for item in facets['genre']}
+    assert counts == {'drama': 2, 'comedy': 1}
+    assert client.get('/api/v1/titles/', {'facets': 'name'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_reverse_genre_changes(catalog, genre):
+    first, second, *_ = catalog
+    genre.titles.remove(second)
+    assert_consistent()
+    genre.titles.clear()
+    assert_consistent()
+
+
+def create_title(client, name):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post('/api/v1/titles/', {
+            'name': name, 'year': 2000, 'category': 'movie',
+            'genre': ['drama'],
+        }, format='json')
+    assert response.status_code == 201
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_title_create_does_not_reaggregate(admin_api_client, catalog):
+    # Версия токена кэшируется после первого запроса.
+    admin_api_client.get('/api/v1/titles/')
+    first = create_title(admin_api_client, 'Новое')
+    category = Title.objects.get(name='Новое').category
+    Title.objects.bulk_create(
+        Title(name=f'Ещё {number}', year=2000, category=category)
+        for number in range(20)
+    )
+    assert create_title(admin_api_client, 'Последнее') == first
+    # bulk_create обходит сигналы, поэтому сверяется только созданное.
+    facet = TitleFacet.objects.get(category=category)
+    assert facet.titles_count == 3
+
+
+@pytest.mark.django_db
+def test_facets_after_bulk_upsert(admin_api_client, catalog, genre):
+    first, second, other_category, other_genre = catalog
+    response = admin_api_client.post('/api/v1/titles/bulk/', [
+        {
+            'id': first.pk, 'name': 'Первое', 'year': 2002,
+            'category': other_category.slug, 'genre': [other_genre.slug],
+        },
+        {
+            'name': 'Третье', 'year': 2001, 'category': 'movie',
+            'genre': [genre.slug, other_genre.slug],
+        },
+    ], format='json')
+    assert response.status_code == 200
+    assert_consistent()
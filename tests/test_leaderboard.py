@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from reviews.leaderboard import refresh_leaderboard, weighted_rating
+from reviews.models import Review, Title, TitleLeaderboard, User
+
+
+def add_reviews(title, score, count, prefix):
+    for number in range(count):
+        author = User.objects.create(
+            username=f'{prefix}{number}', email=f'{prefix}{number}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=score
+        )
+
+
+@pytest.mark.django_db
+def test_incremental_refresh_recomputes_all_when_mean_drifts(settings):
+    settings.LEADERBOARD_MIN_REVIEWS = 2
+    first = Title.objects.create(name='Первое', year=2000)
+    second = Title.objects.create(name='Второе', year=2000)
+    add_reviews(first, 8, 2, 'a')
+    add_reviews(second, 6, 2, 'b')
+    # Без отзывов за период трендов первое не считается изменившимся.
+    Review.objects.update(pub_date=timezone.now() - timedelta(days=30))
+    refresh_leaderboard()
+    add_reviews(second, 1, 6, 'c')
+    refresh_leaderboard()
+    rows = list(TitleLeaderboard.objects.select_related('title'))
+    mean = 34 / 10
+    for row in rows:
+        assert row.weighted_rating == pytest.approx(weighted_rating(
+            row.title.reviews_count, row.title.score_sum, mean, 2
+        ))
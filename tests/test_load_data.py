@@ -0,0 +1,58 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Review, Title, User
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerows(rows)
+
+
+def load(path):
+    stdout = StringIO()
+    call_command(
+        'load_yamdb_data', path=path, rejects_dir=path, stdout=stdout
+    )
+    return stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_load_reports_skipped_and_malformed_rows(tmp_path, category):
+    write_csv(tmp_path / 'category.csv', [
+        ('id', 'name', 'slug'),
+        (category.pk, category.name, category.slug),
+        (category.pk + 1, 'Книга', 'book'),
+        (category.pk + 2, 'Ещё книга', 'book'),
+    ])
+    write_csv(tmp_path / 'users.csv', [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        (100, 'critic', 'critic@yamdb.fake', 'user', '', '', ''),
+    ])
+    write_csv(tmp_path / 'titles.csv', [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Произведение', 2000, category.pk),
+    ])
+    write_csv(tmp_path / 'review.csv', [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Хорошо', 100, 'десять', '2020-01-01T00:00:00Z'),
+        (2, 1, 'Плохо', 100, 3, '2020-01-01T00:00:00Z'),
+    ])
+    output = load(tmp_path)
+    # Существующая категория и повтор slug'а не загружены.
+    assert 'category.csv: загружено 1, отклонено 2' in output
+    assert 'review.csv: загружено 1, отклонено 1' in output
+    assert Category.objects.count() == 2
+    assert list(Review.objects.values_list('score', flat=True)) == [3]
+    with open(tmp_path / 'rejected_category.csv', encoding='utf-8') as file:
+        rejected = list(csv.DictReader(file))
+    assert [row['name'] for row in rejected] == [category.name, 'Ещё книга']
+    with open(tmp_path / 'rejected_review.csv', encoding='utf-8') as file:
+        assert [row['score'] for row in csv.DictReader(file)] == ['десять']
+    assert Title.objects.get().reviews_count == 1
+    assert User.objects.filter(username='critic').exists()
@@ -0,0 +1,152 @@
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+
+from api import mail_queue as mail_queue_module
+from api.mail_queue import MailQueue
+
+
+class FailingConnection:
+    """Соединение, которое не отправляет первые failures писем."""
+
+    def __init__(self, state):
+        self.state = state
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        self.state['attempts'] += 1
+        if self.state['attempts'] <= self.state['failures']:
+            raise ConnectionError('SMTP недоступен')
+        mail.outbox.extend(messages)
+
+
+@pytest.fixture
+def failing_connection(monkeypatch):
+    state = {'attempts': 0, 'failures': 0}
+    monkeypatch.setattr(
+        mail_queue_module,
+        'get_connection',
+        lambda **kwargs: FailingConnection(state)
+    )
+    return state
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и запоминает их."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost')
+        recipients = []
+        for line in self.rfile:
+            verb = line[:4].decode().upper()
+            if verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            if verb == 'RCPT':
+                recipients.append(line.decode().split(':', 1)[1].strip())
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                self.server.messages.append(
+                    (recipients, message_from_bytes(data))
+                )
+                recipients = []
+            self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections, server.messages = 0, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = None
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def message(number=0):
+    return EmailMessage(
+        'Code', str(number), 'yamdb@yamdb.fake', [f'user{number}@yamdb.fake']
+    )
+
+
+def test_sync_delivery(settings):
+    settings.MAIL_QUEUE_WORKERS = 0
+    MailQueue().enqueue(message())
+    assert [sent.to for sent in mail.outbox] == [['user0@yamdb.fake']]
+
+
+def test_sync_delivery_fails_fast(settings, failing_connection):
+    settings.MAIL_QUEUE_WORKERS = 0
+    settings.MAIL_QUEUE_MAX_RETRIES = 5
+    settings.MAIL_QUEUE_RETRY_DELAY = 10
+    failing_connection['failures'] = 10
+    started = time.monotonic()
+    MailQueue().enqueue(message())
+    assert time.monotonic() - started < 1
+    assert failing_connection['attempts'] == 1
+    assert not mail.outbox
+
+
+def test_workers_deliver_all_messages(settings):
+    settings.MAIL_QUEUE_WORKERS = 2
+    queue = MailQueue()
+    for number in range(10):
+        queue.enqueue(message(number))
+    assert queue.flush(timeout=5)
+    assert sorted(sent.body for sent in mail.outbox) == sorted(
+        str(number) for number in range(10)
+    )
+
+
+def test_workers_retry_failed_messages(settings, failing_connection):
+    settings.MAIL_QUEUE_WORKERS = 1
+    settings.MAIL_QUEUE_MAX_RETRIES = 2
+    settings.MAIL_QUEUE_RETRY_DELAY = 0
+    failing_connection['failures'] = 1
+    queue = MailQueue()
+    queue.enqueue(message())
+    assert queue.flush(timeout=5)
+    assert failing_connection['attempts'] == 2
+    assert len(mail.outbox) == 1
+
+
+def test_sync_delivery_over_smtp(settings, smtp_server):
+    settings.MAIL_QUEUE_WORKERS = 0
+    MailQueue().enqueue(message())
+    [(recipients, sent)] = smtp_server.messages
+    assert recipients == ['<user0@yamdb.fake>']
+    assert sent['Subject'] == 'Code'
+    assert sent.get_payload().strip() == '0'
+
+
+def test_worker_reuses_smtp_connection(settings, smtp_server):
+    settings.MAIL_QUEUE_WORKERS = 1
+    queue = MailQueue()
+    for number in range(3):
+        queue.enqueue(message(number))
+    assert queue.flush(timeout=5)
+    assert sorted(
+        sent.get_payload().strip() for _, sent in smtp_server.messages
+    ) == ['0', '1', '2']
+    assert smtp_server.connections == 1
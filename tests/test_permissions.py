@@ -0,0 +1,83 @@
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def review(user, category):
+    title = Title.objects.create(
+        name='Произведение', year=2000, category=category
+    )
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=5
+    )
+
+
+@pytest.fixture
+def comment(user, review):
+    return Comment.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
+
+
+@pytest.fixture
+def author_client(user_client):
+    # Версия токена кэшируется после первого запроса.
+    user_client.get('/api/v1/titles/')
+    return user_client
+
+
+def review_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+
+
+def comment_url(comment):
+    return f'{review_url(comment.review)}comments/{comment.pk}/'
+
+
+@pytest.mark.django_db
+def test_review_patch_queries(author_client, review,
+                              django_assert_num_queries):
+    # Отзыв; SAVEPOINT, UPDATE отзыва, произведения и фасетов, RELEASE.
+    with django_assert_num_queries(6):
+        response = author_client.patch(
+            review_url(review), {'score': 7}, format='json'
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_review_delete_queries(author_client, review,
+                               django_assert_num_queries):
+    # Отзыв; DELETE комментариев и отзыва, UPDATE произведения и фасетов.
+    with django_assert_num_queries(5):
+        response = author_client.delete(review_url(review))
+    assert response.status_code == 204
+
+
+@pytest.mark.django_db
+def test_comment_patch_queries(author_client, comment,
+                               django_assert_num_queries):
+    with django_assert_num_queries(2):
+        response = author_client.patch(
+            comment_url(comment), {'text': 'Новый'}, format='json'
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_comment_delete_queries(author_client, comment,
+                                django_assert_num_queries):
+    with django_assert_num_queries(2):
+        response = author_client.delete(comment_url(comment))
+    assert response.status_code == 204
+
+
+@pytest.mark.django_db
+def test_comments_of_review_from_other_title_not_found(client, comment,
+                                                       category):
+    other = Title.objects.create(name='Другое', year=2001, category=category)
+    url = f'/api/v1/titles/{other.pk}/reviews/{comment.review_id}/comments/'
+    assert client.get(url).status_code == 404
+    assert client.get(f'{url}{comment.pk}/').status_code == 404
+    assert client.get(comment_url(comment)).status_code == 200
@@ -0,0 +1,45 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, User
+
+
+def create_title(name, reviews_count, year=2000):
+    title = Title.objects.create(name=name, year=year)
+    for number in range(reviews_count):
+        author = User.objects.create(
+            username=f'{name}{number}', email=f'{name}{number}@yamdb.fake'
+        )
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=number % 10 + 1
+        )
+    return title
+
+
+def count_delete_queries(client, title):
+    with CaptureQueriesContext(connection) as context:
+        response = client.delete(f'/api/v1/titles/{title.pk}/')
+    assert response.status_code == 204
+    return len(context)
+
+
+@pytest.mark.django_db
+def test_title_delete_does_not_update_per_review(admin_api_client):
+    small = create_title('small', 2)
+    large = create_title('large', 6, year=2001)
+    admin_api_client.get('/api/v1/titles/')
+    assert count_delete_queries(
+        admin_api_client, small
+    ) == count_delete_queries(admin_api_client, large)
+    assert not Title.objects.exists()
+
+
+@pytest.mark.django_db
+def test_review_delete_updates_title_rating():
+    title = create_title('title', 3)
+    Review.objects.filter(title=title, score=3).get().delete()
+    title.refresh_from_db()
+    assert (title.reviews_count, title.score_sum, title.rating) == (
+        2, 3, 1.5
+    )
@@ -0,0 +1,35 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    'id': 1,
+    'text': 'Отзыв с «кавычками», \\ и \u2028',
+    'pub_date': datetime(2023, 1, 2, 3, 4, 5, 6000, tzinfo=timezone.utc),
+    'score': 7,
+    'rating': 7.25,
+    'results': [None, True, {'name': 'Драма'}],
+}
+
+
+def test_same_bytes_as_json_renderer():
+    assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+def test_float_exponent_differs_but_json_is_equal():
+    data = {'value': 1e16}
+    fast = FastJSONRenderer().render(data)
+    assert fast == b'{"value":1e16}'
+    assert JSONRenderer().render(data) == b'{"value":1e+16}'
+    assert json.loads(fast) == data
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf')])
+def test_non_finite_float_becomes_null(value):
+    assert FastJSONRenderer().render({'value': value}) == b'{"value":null}'
+    with pytest.raises(ValueError):
+        JSONRenderer().render({'value': value})
@@ -0,0 +1,69 @@
+import pytest
+from django.core import mail
+
+from reviews.models import User
+from reviews.signup import (CREATED, EMAIL_TAKEN, EXISTING, USERNAME_TAKEN,
+                            signup_user)
+
+URL = '/api/v1/auth/signup/'
+
+
+@pytest.fixture(autouse=True)
+def send_mail_at_once(settings):
+    settings.MAIL_QUEUE_WORKERS = 0
+
+
+@pytest.fixture
+def bob():
+    return User.objects.create(username='Bob', email='bob@yamdb.fake')
+
+
+@pytest.mark.django_db
+def test_signup_creates_user(client):
+    response = client.post(
+        URL, {'username': 'alice', 'email': 'alice@yamdb.fake'}
+    )
+    assert response.status_code == 200
+    assert User.objects.filter(username='alice').exists()
+    assert mail.outbox[0].to == ['alice@yamdb.fake']
+
+
+@pytest.mark.django_db
+def test_signup_existing_user_ignores_case(client, bob):
+    response = client.post(
+        URL, {'username': 'bob', 'email': 'BOB@yamdb.fake'}
+    )
+    assert response.status_code == 200
+    assert User.objects.count() == 1
+    assert mail.outbox[0].to == ['bob@yamdb.fake']
+
+
+@pytest.mark.django_db
+def test_signup_username_taken(client, bob):
+    response = client.post(
+        URL, {'username': 'BOB', 'email': 'other@yamdb.fake'}
+    )
+    assert response.status_code == 400
+    assert list(response.json()) == ['username']
+    assert User.objects.count() == 1
+    assert not mail.outbox
+
+
+@pytest.mark.django_db
+def test_signup_email_taken(client, bob):
+    response = client.post(
+        URL, {'username': 'alice', 'email': 'Bob@YaMDb.fake'}
+    )
+    assert response.status_code == 400
+    assert list(response.json()) == ['email']
+    assert User.objects.count() == 1
+    assert not mail.outbox
+
+
+@pytest.mark.django_db
+def test_signup_user_statuses(bob):
+    status, user = signup_user('alice', 'alice@yamdb.fake')
+    assert status == CREATED and user.username == 'alice'
+    assert signup_user('BOB', 'bob@yamdb.fake') == (EXISTING, bob)
+    assert signup_user('bob', 'x@yamdb.fake') == (USERNAME_TAKEN, None)
+    assert signup_user('carol', 'ALICE@yamdb.fake') == (EMAIL_TAKEN, None)
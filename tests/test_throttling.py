@@ -0,0 +1,61 @@
+import pytest
+
+from api.throttling import LocMemBucketStore
+
+URL = '/api/v1/auth/token/'
+
+
+def post_token(client, username, **headers):
+    return client.post(
+        URL, {'username': username, 'confirmation_code': 'wrong'},
+        format='json', **headers
+    )
+
+
+def test_store_takes_tokens_only_when_all_buckets_allow():
+    store = LocMemBucketStore()
+    assert store.take([('ip', 3, 3600), ('name', 1, 3600)]) == 0
+    assert store.take([('ip', 3, 3600), ('name', 1, 3600)]) > 0
+    assert store.take([('ip', 3, 3600), ('other', 1, 3600)]) == 0
+    assert store.take([('ip', 3, 3600), ('third', 1, 3600)]) == 0
+    assert store.take([('ip', 3, 3600), ('fourth', 1, 3600)]) > 0
+
+
+@pytest.mark.django_db
+def test_forwarded_for_is_ignored_without_proxies(client, settings):
+    settings.AUTH_THROTTLE_RATES = {'token': {'ip': '2/hour'}}
+    statuses = [
+        post_token(
+            client, f'ghost{number}', HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+        ).status_code
+        for number in range(3)
+    ]
+    assert statuses[:2] == [404, 404]
+    assert statuses[2] == 429
+
+
+@pytest.mark.django_db
+def test_forwarded_for_is_used_behind_proxies(client, settings):
+    settings.AUTH_THROTTLE_RATES = {'token': {'ip': '1/hour'}}
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+    statuses = [
+        post_token(
+            client, 'ghost', HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+        ).status_code
+        for number in range(2)
+    ]
+    assert statuses == [404, 404]
+
+
+@pytest.mark.django_db
+def test_rejected_request_does_not_spend_ip_tokens(client, settings):
+    settings.AUTH_THROTTLE_RATES = {
+        'token': {'ip': '3/hour', 'username': '1/hour'}
+    }
+    assert post_token(client, 'ghost').status_code == 404
+    response = post_token(client, 'ghost')
+    assert response.status_code == 429
+    assert 'Retry-After' in response
+    assert post_token(client, 'ghost2').status_code == 404
+    assert post_token(client, 'ghost3').status_code == 404
+    assert post_token(client, 'ghost4').status_code == 429
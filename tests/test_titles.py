@@ -0,0 +1,61 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import CachedCountPagination
+from reviews.models import Category, Genre, Title
+
+URL = '/api/v1/titles/'
+
+
+def count_list_queries(client, monkeypatch, page_size):
+    monkeypatch.setattr(CachedCountPagination, 'page_size', page_size)
+    caches['default'].clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(URL)
+    assert response.status_code == 200
+    assert len(response.data['results']) == page_size
+    return len(context)
+
+
+@pytest.mark.django_db
+def test_titles_list_queries_do_not_grow_with_page_size(client, monkeypatch):
+    categories = [
+        Category.objects.create(name=f'Категория {number}', slug=f'c{number}')
+        for number in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+        for number in range(3)
+    ]
+    for number in range(12):
+        title = Title.objects.create(
+            name=f'Произведение {number:02}',
+            year=2000,
+            category=categories[number % 3]
+        )
+        title.genre.set(genres[:number % 3 + 1])
+    assert count_list_queries(client, monkeypatch, 2) == count_list_queries(
+        client, monkeypatch, 10
+    )
+
+
+@pytest.mark.django_db
+def test_search_falls_back_to_icontains(client):
+    Title.objects.create(name='Matrix', year=1999)
+    Title.objects.create(
+        name='Сталкер', year=1979, description='По мотивам повести Стругацких'
+    )
+    Title.objects.create(name='Солярис', year=1972, description='Космос')
+
+    def search(value):
+        response = client.get(URL, {'search': value})
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.data['results'])
+
+    # SQLite LIKE не различает регистр только у латиницы.
+    assert search('matr') == ['Matrix']
+    assert search('Стругацких') == ['Сталкер']
+    assert search('С') == ['Солярис', 'Сталкер']
+    assert search('Тарковский') == []
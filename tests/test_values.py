@@ -0,0 +1,22 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+def test_review_list_counts_without_author_join(client, user):
+    title = Title.objects.create(name='Произведение', year=2000)
+    Review.objects.create(title=title, author=user, text='Отзыв', score=5)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+    assert response.status_code == 200
+    assert response.json()['count'] == 1
+    assert response.json()['results'][0]['author'] == user.username
+    counts = [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+    assert len(counts) == 1
+    assert 'reviews_user' not in counts[0]